@@ -0,0 +1,188 @@
+"""Agrawal-Kayal-Saxena (AKS) deterministic primality test.
+
+Polynomials modulo (X^r - 1, n) are squared with NumPy: the coefficients
+are split into bytes (Kronecker substitution along the second axis) and
+one 2-D real FFT computes the product, cyclic in the degree axis (which
+is exactly the reduction by X^r - 1) and linear in the byte axis.  The
+exact integer convolution is reassembled into one packed big integer, the
+multiplication by (X + a) is a shift-and-add on that integer, and only the
+final reduction mod n touches coefficients one at a time.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from math import gcd, log2, sqrt
+
+import numpy as np
+
+from bigint_backend import iroot
+
+# Above this many coefficient bytes, square polynomials with NumPy's FFT
+FFT_THRESHOLD = 4096
+
+# ----- Integer helpers -----
+def integer_root(n, k):
+    """Floor of the k-th root of n >= 0."""
+    return iroot(n, k)[0]
+
+
+def is_perfect_power(n):
+    """True if n = a**b for integers a >= 2, b >= 2."""
+    for b in range(2, n.bit_length() + 1):
+        a, exact = iroot(n, b)
+        if a < 2:
+            break
+        if exact:
+            return True
+    return False
+
+
+def euler_phi(r):
+    """Euler's totient of a small integer r."""
+    result, m, p = r, r, 2
+    while p * p <= m:
+        if m % p == 0:
+            while m % p == 0:
+                m //= p
+            result -= result // p
+        p += 1
+    if m > 1:
+        result -= result // m
+    return result
+
+
+def find_r(n):
+    """Smallest r with ord_r(n) > log2(n)^2."""
+    max_k = int(log2(n) ** 2)
+    r = 2
+    while True:
+        if gcd(r, n) == 1:
+            x, k = n % r, 1
+            while x != 1 and k <= max_k:
+                x = x * n % r
+                k += 1
+            if k > max_k:
+                return r
+        r += 1
+
+
+# ----- Polynomial arithmetic mod (X^r - 1, n) -----
+def pack(coeffs, width):
+    """Kronecker-pack coefficients (lowest degree first) into one integer."""
+    return int.from_bytes(b"".join(c.to_bytes(width, "little") for c in coeffs), "little")
+
+
+def poly_square_packed(coeffs, r, nbytes, width):
+    """Square a polynomial mod X^r - 1 without reducing mod n.
+
+    `coeffs` are r integers below 256**nbytes.  Returns the product packed
+    as one integer with coefficient s in bytes [s*width, (s+1)*width).
+    Small polynomials use one CPython big-int multiplication; larger ones
+    go through NumPy's FFT, which beats CPython's Karatsuba there.
+    """
+    if r * nbytes <= FFT_THRESHOLD:
+        packed = pack(coeffs, width)
+        square = packed * packed
+        shift = 8 * width * r
+        return (square & ((1 << shift) - 1)) + (square >> shift)
+
+    digits = np.frombuffer(b"".join(c.to_bytes(nbytes, "little") for c in coeffs), np.uint8)
+    digits = digits.reshape(r, nbytes).astype(np.float64)
+    spectrum = np.fft.rfft2(digits, s=(r, 2 * nbytes))
+    # entries are below r * nbytes * 255**2, exact after rounding
+    conv = np.rint(np.fft.irfft2(spectrum * spectrum, s=(r, 2 * nbytes))).astype(np.int64)
+
+    # coefficient s = sum_k conv[s, k] * 256**k; add it up one byte plane
+    # of the int64 entries at a time so every plane is a valid byte string
+    planes = conv.view(np.uint8).reshape(r, 2 * nbytes, 8)
+    slots = np.zeros((r, width), dtype=np.uint8)
+    packed = 0
+    for j in range(8):
+        plane = planes[:, :, j]
+        if plane.any():
+            # bytes past `width` are zero thanks to the slot headroom
+            m = min(2 * nbytes, width - j)
+            slots[:] = 0
+            slots[:, j:j + m] = plane[:, :m]
+            packed += int.from_bytes(slots.tobytes(), "little")
+    return packed
+
+
+def unpack_mod(value, n, r, width):
+    """Read r slots of `width` bytes back out of `value`, reducing mod n."""
+    raw = memoryview(value.to_bytes(width * r, "little"))
+    return [int.from_bytes(raw[i:i + width], "little") % n for i in range(0, width * r, width)]
+
+
+def poly_powmod_linear(a, n, r):
+    """(X + a)^n mod (X^r - 1, n) by left-to-right repeated squaring."""
+    nbytes = (n.bit_length() + 7) // 8
+    # slot headroom: r products below n^2, times (a + 1), plus one fold
+    bits = 2 * n.bit_length() + r.bit_length() + (a + 1).bit_length() + 1
+    width = (bits + 7) // 8
+    shift = 8 * width * r
+    mask = (1 << shift) - 1
+
+    coeffs = [1] + [0] * (r - 1)
+    for bit in bin(n)[2:]:
+        packed = poly_square_packed(coeffs, r, nbytes, width)
+        if bit == "1":
+            # times (X + a): shift every coefficient up one slot, then fold
+            # the slot that moved past degree r - 1 back onto degree 0
+            packed = (packed << (8 * width)) + a * packed
+            packed = (packed & mask) + (packed >> shift)
+        coeffs = unpack_mod(packed, n, r, width)
+    return coeffs
+
+
+# ----- AKS -----
+def check_witnesses(n, r, a_values):
+    """True if (X + a)^n == X^(n mod r) + a  mod (X^r - 1, n) for every a."""
+    for a in a_values:
+        expected = [0] * r
+        expected[0] = a % n
+        expected[n % r] = (expected[n % r] + 1) % n
+        if poly_powmod_linear(a, n, r) != expected:
+            return False
+    return True
+
+
+def is_prime_aks(n, workers=1):
+    """Deterministic AKS primality test.
+
+    The polynomial congruences of step 5 are independent; with
+    workers > 1 they are split across a process pool.
+    """
+    if n < 2:
+        return False
+    if n < 4:
+        return True
+
+    # Step 1: perfect powers are composite
+    if is_perfect_power(n):
+        return False
+
+    # Step 2: smallest r with ord_r(n) > log2(n)^2
+    r = find_r(n)
+
+    # Step 3: small common factors
+    for a in range(2, min(r, n - 1) + 1):
+        if 1 < gcd(a, n) < n:
+            return False
+
+    # Step 4
+    if n <= r:
+        return True
+
+    # Step 5: the polynomial congruences for a = 1 .. sqrt(phi(r)) * log2(n)
+    limit = int(sqrt(euler_phi(r)) * log2(n))
+    if workers <= 1:
+        return check_witnesses(n, r, range(1, limit + 1))
+
+    chunks = [range(start, limit + 1, workers * 4) for start in range(1, workers * 4 + 1)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(check_witnesses, n, r, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            if not future.result():
+                pool.shutdown(cancel_futures=True)
+                return False
+    return True
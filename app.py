@@ -1,12 +1,29 @@
 # app.py
 import streamlit as st
+import multiprocessing
+import os
 import random
 import secrets
+import threading
 import time
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
 
-from daa_project import sieve, is_probable_prime
-from daa_1 import compare_algorithms
+from prime_core import is_probable_prime, prime_label, primes_label
+from daa_1 import aks_test, miller_rabin_test
+import metrics
+from bigint_backend import BACKEND as BIGINT_BACKEND
+from factorization import factorize, format_factors
+from jobs import (CANCELLED, DONE, FACTOR_MAX_B1, FAILED, JobRunner, bitmap_task, compare_task, factor_task,
+                  generate_task, range_scan_task, sieve_task)
+from jobs import FACTOR_TIME_LIMIT as FACTOR_JOB_TIME_LIMIT
+from keypair_pool import KeypairPool
+from prime_generation import SAFE_MIN_BITS, STRONG_MIN_BITS, generate_primes, generate_safe_primes, generate_strong_primes
+from prime_sequence import PrimeSequence
+from prime_store import default_store
+from prime_bitmap import DEFAULT_PATH as BITMAP_PATH, PrimeBitmap
+from primality import use_bitmap
+from sieve_cache import SieveCache
+from trial_division import TrialDivisor
 from rsa_simulation import RSA  
 
 # Custom CSS for blueish buttons
@@ -57,13 +74,143 @@ PAGES = [
     "RSA Simulation"
 ]
 
+# Seconds spent factoring a composite on the prime-check page
+FACTOR_TIME_LIMIT = 2.0
+
+# Largest input of the AKS comparison: one AKS run takes ~3s at 7 digits
+# and grows ~2.3x per digit (~30s at 10), times up to 10 repetitions
+AKS_MAX_DIGITS = 7
+
+# Ready-made RSA keypairs per (prime size, prime count), refilled below the
+# low-water mark; a take() on an empty pool waits at most this many seconds
+KEYPAIR_POOL_SIZE = 4
+KEYPAIR_LOW_WATER = 2
+KEYPAIR_TAKE_TIMEOUT = 60.0
+
 # initialize session_state keys
 st.session_state.setdefault("current_page", PAGES[0])
-st.session_state.setdefault("small_primes", [])
-st.session_state.setdefault("probable_primes", [])
+st.session_state.setdefault("small_primes", PrimeSequence())
 st.session_state.setdefault("rsa", None)
 st.session_state.setdefault("cipher", "")
 
+# Found primes live in the on-disk store, shared by every session and the CLI
+@st.cache_resource
+def get_prime_store():
+    return default_store()
+
+prime_store = get_prime_store()
+
+# One sieve cache per server process: sessions share results instead of
+# each keeping its own copy
+@st.cache_resource
+def get_sieve_cache():
+    return SieveCache()
+
+sieve_cache = get_sieve_cache()
+
+# Prebuilt prime bitmap (if present): mmapped once per process and used by
+# is_probable_prime as an O(1) fast path below its limit
+@st.cache_resource
+def get_prime_bitmap():
+    try:
+        bitmap = PrimeBitmap(BITMAP_PATH)
+    except (OSError, ValueError):
+        bitmap = None
+    use_bitmap(bitmap)
+    return bitmap
+
+prime_bitmap = get_prime_bitmap()
+
+# Product tree over the primes below 100,000, built once per process, for
+# reporting a small factor of composite inputs
+@st.cache_resource
+def get_trial_divisor():
+    return TrialDivisor(sieve_cache.get(100_000))
+
+trial_divisor = get_trial_divisor()
+
+# Background jobs: one thread pool per server process (bounded concurrency);
+# each session only keeps the ids of its jobs in session_state
+@st.cache_resource
+def get_job_runner():
+    return JobRunner()
+
+job_runner = get_job_runner()
+
+# Worker processes for range-scan chunks, shared by every session; spawned
+# rather than forked because the server process is multi-threaded
+@st.cache_resource
+def get_scan_pool():
+    workers = os.cpu_count() or 1
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+scan_pool = get_scan_pool()
+
+# One keypair pool at a time, shared by every session; refills run on the
+# worker processes when there are several cores.  Switching configuration
+# closes the previous pool so its prefetching stops competing with jobs.
+@st.cache_resource
+def get_keypair_slot():
+    return {"pool": None, "lock": threading.Lock()}
+
+def get_keypair_pool(bits, nprimes):
+    slot = get_keypair_slot()
+    with slot["lock"]:
+        pool = slot["pool"]
+        if pool is None or (pool.bits, pool.nprimes) != (bits, nprimes):
+            if pool is not None:
+                pool.close()
+            pool = slot["pool"] = KeypairPool(bits, nprimes, size=KEYPAIR_POOL_SIZE,
+                                              low_water=KEYPAIR_LOW_WATER, executor=scan_pool)
+    return pool
+
+def start_job(key, name, task, *args):
+    """Submit a background job and remember its id under session_state[key]."""
+    try:
+        job_id = job_runner.submit(name, task, *args)
+    except RuntimeError as e:
+        st.error(str(e))
+        return
+    st.session_state[key] = job_id
+    job_runner.get(job_id).wait(0.5)  # quick jobs render without a refresh cycle
+
+@st.fragment(run_every=1.0)
+def job_progress(key):
+    """Live progress, partial results and a cancel button; reruns the page when the job ends."""
+    job = job_runner.get(st.session_state.get(key))
+    if job is None or not job.active:
+        st.rerun()
+    snap = job.snapshot(preview=20)
+    st.progress(snap["progress"], text=f"{snap['name']} — {snap['status']} · {snap['progress']:.0%} · {snap['elapsed_s']:.1f}s")
+    if snap["count"]:
+        rate = snap["count"] / snap["elapsed_s"] if snap["elapsed_s"] else 0.0
+        st.caption(f"{snap['count']:,} found so far ({rate:,.0f}/s): {', '.join(map(str, snap['results']))}, ...")
+    if st.button("Cancel", key=f"cancel_{key}"):
+        job.cancel()
+
+def finished_job(key):
+    """The session's job under `key` once it has ended; shows its progress and returns None meanwhile."""
+    job = job_runner.get(st.session_state.get(key))
+    if job is None:
+        return None
+    if job.active:
+        job_progress(key)
+        return None
+    if job.status == FAILED:
+        st.error(f"{job.name} failed: {job.error}")
+    return job
+
+def show_factorization(n):
+    """Full factorization of a composite, bounded by FACTOR_TIME_LIMIT."""
+    result = factorize(n, trial_divisor, time_limit=FACTOR_TIME_LIMIT)
+    text = f"{n} = {format_factors(result['factors'], result['unfactored'])}"
+    if result["complete"]:
+        st.info(f"{text} (factored in {result['seconds']:.4f}s)")
+    else:
+        st.warning(f"{text} — bracketed cofactor not split within {FACTOR_TIME_LIMIT:.0f}s")
+
 # Sidebar navigation (keep in sync with session_state)
 # Compute index safely
 try:
@@ -89,7 +236,7 @@ if st.session_state["current_page"] == "Large Prime Generation":
     st.write("Generate primes (Sieve) and test numbers (Miller–Rabin). Primes are stored in memory for reuse.")
 
     st.subheader("1 — Generate base primes (Sieve)")
-    limit_input = st.text_input("Sieve limit (max 5,000,000)", value="100000", key="sieve_limit")
+    limit_input = st.text_input("Sieve limit (max 50,000,000)", value="100000", key="sieve_limit")
 
     if st.button("Run Sieve", key="run_sieve"):
         if not limit_input.strip() or not limit_input.isdigit():
@@ -98,24 +245,55 @@ if st.session_state["current_page"] == "Large Prime Generation":
             limit = int(limit_input)
             if limit < 1000:
                 st.error("Limit too small — use ≥ 1,000.")
-            elif limit > 5_000_000:
-                st.error("Limit too large — use ≤ 5,000,000.")
+            elif limit > 50_000_000:
+                st.error("Limit too large — use ≤ 50,000,000.")
             else:
-                with st.spinner("Running sieve..."):
-                    t0 = time.perf_counter()
-                    primes = sieve(limit)
-                    t1 = time.perf_counter()
-                    st.session_state["small_primes"] = primes
-                    st.success(f"Generated {len(primes)} primes in {t1 - t0:.4f} s")
+                start_job("sieve_job", f"Sieve ≤ {limit:,}", sieve_task, sieve_cache, limit)
+
+    sieve_job = finished_job("sieve_job")
+    if sieve_job is not None and sieve_job.status == DONE:
+        primes = sieve_job.value  # PrimeSequence view of a shared cache entry
+        st.session_state["small_primes"] = primes
+        st.success(f"Generated {len(primes)} primes in {sieve_job.elapsed():.4f} s")
+
+    with st.expander("Prime bitmap index — π(x) and n-th prime"):
+        if prime_bitmap is None:
+            st.write("No bitmap built yet.")
+        else:
+            st.write(f"Bitmap covers n ≤ {prime_bitmap.limit:,} ({prime_bitmap.count():,} primes); "
+                     "primality checks in that range are a single bit lookup.")
+        bitmap_limit = st.number_input("Bitmap limit (max 10,000,000,000)", min_value=1000,
+                                       max_value=10_000_000_000, value=100_000_000, step=1_000_000, key="bitmap_limit")
+        if st.button("Build bitmap", key="btn_build_bitmap"):
+            start_job("bitmap_job", f"Bitmap ≤ {int(bitmap_limit):,}", bitmap_task, int(bitmap_limit), BITMAP_PATH)
+        bitmap_job = finished_job("bitmap_job")
+        if bitmap_job is not None and bitmap_job.status == DONE:
+            # reopen the new file once per finished build, then redraw the summary above
+            if st.session_state.get("bitmap_loaded") != bitmap_job.id:
+                get_prime_bitmap.clear()
+                get_prime_bitmap()
+                st.session_state["bitmap_loaded"] = bitmap_job.id
+                st.rerun()
+            st.success(f"{bitmap_job.value:,} primes indexed in {bitmap_job.elapsed():.2f}s")
+        elif bitmap_job is not None and bitmap_job.status == CANCELLED:
+            st.warning(f"{bitmap_job.name} cancelled after {bitmap_job.elapsed():.1f}s — the previous bitmap is kept")
+        if prime_bitmap is not None:
+            col_pi, col_nth = st.columns(2)
+            with col_pi:
+                x = st.number_input("x", min_value=0, max_value=prime_bitmap.limit, value=min(10**6, prime_bitmap.limit), key="bitmap_x")
+                st.write(f"π({int(x):,}) = {prime_bitmap.pi(int(x)):,}")
+            with col_nth:
+                k = st.number_input("k", min_value=1, max_value=prime_bitmap.count(), value=1, key="bitmap_k")
+                st.write(f"Prime #{int(k):,} = {prime_bitmap.nth_prime(int(k)):,}")
 
     st.divider()
     st.subheader("2 — Miller–Rabin testing (use generated primes)")
 
-    if not st.session_state["small_primes"]:
+    if len(st.session_state["small_primes"]) == 0:
         st.warning("Run the sieve first to get a small-primes list.")
     else:
         small_primes = st.session_state["small_primes"]
-        mode = st.radio("Mode", ["Single Number", "Range", "Random Number"], key="mode_main")
+        mode = st.radio("Mode", ["Single Number", "Range", "Random Number", "Random Prime (bits)"], key="mode_main")
 
         # Single number
         if mode == "Single Number":
@@ -131,14 +309,18 @@ if st.session_state["current_page"] == "Large Prime Generation":
                         st.error("Number too large — use ≤ 1e10.")
                     else:   
                         t0 = time.perf_counter()
-                        res = is_probable_prime(n)
+                        factor = trial_divisor.smallest_factor(n)
+                        res = factor in (None, n) and is_probable_prime(n)
                         t1 = time.perf_counter()
                         if res:
-                            st.success(f"{n} → Probably prime (checked in {t1-t0:.6f}s)")
-                            if n not in st.session_state["probable_primes"]:
-                                st.session_state["probable_primes"].append(n)
+                            st.success(f"{n} → {prime_label(n)} (checked in {t1-t0:.6f}s)")
+                            prime_store.add(n)
+                        elif factor not in (None, n):
+                            st.error(f"{n} → Composite, divisible by {factor} (checked in {t1-t0:.6f}s)")
+                            show_factorization(n)
                         else:
                             st.error(f"{n} → Composite (checked in {t1-t0:.6f}s)")
+                            show_factorization(n)
 
         # Range
         elif mode == "Range":
@@ -151,22 +333,25 @@ if st.session_state["current_page"] == "Large Prime Generation":
                     start_n = int(start_s); end_n = int(end_s)
                     if start_n >= end_n:
                         st.error("Start must be smaller than end.")
-                    elif end_n - start_n > 10000:
-                        st.error("Range too large; limit to 10,000 numbers")
+                    elif end_n - start_n > 10_000_000:
+                        st.error("Range too large; limit to 10,000,000 numbers")
                     else:
-                        found = []
-                        with st.spinner("Testing range..."):
-                            t0 = time.perf_counter()
-                            for x in range(start_n, end_n+1):
-                                if all(x % p != 0 for p in small_primes if p < x):
-                                    if is_probable_prime(x):
-                                        found.append(x)
-                                        if x not in st.session_state["probable_primes"]:
-                                            st.session_state["probable_primes"].append(x)
-                            t1 = time.perf_counter()
-                        st.success(f"Found {len(found)} probable primes in {t1-t0:.4f}s")
-                        if found:
-                            st.text_area("Probable primes (scrollable)", ", ".join(map(str, found)), height=160)
+                        start_job("range_job", f"Range [{start_n:,}, {end_n:,}]", range_scan_task, start_n, end_n, scan_pool)
+
+            range_job = finished_job("range_job")
+            if range_job is not None and range_job.status in (DONE, CANCELLED):
+                found = range_job.results  # found primes are already in the store
+                noun = primes_label(found[-1] if found else None)
+                if range_job.status == DONE:
+                    st.success(f"Found {len(found)} {noun} in {range_job.elapsed():.4f}s")
+                else:
+                    st.warning(f"{range_job.name} cancelled after {range_job.elapsed():.1f}s — {len(found)} {noun} found before that")
+                if found:
+                    shown = found[:5000]
+                    label = f"{noun.capitalize()} (scrollable)"
+                    if len(found) > len(shown):
+                        label += f" — first {len(shown)} of {len(found)}"
+                    st.text_area(label, ", ".join(map(str, shown)), height=160)
 
         # Random number
         elif mode == "Random Number":
@@ -183,17 +368,50 @@ if st.session_state["current_page"] == "Large Prime Generation":
                         n = random.randint(l, h)
                         st.info(f"Testing random number {n} ...")
                         t0 = time.perf_counter()
-                        r = is_probable_prime(n)
+                        factor = trial_divisor.smallest_factor(n)
+                        r = factor in (None, n) and is_probable_prime(n)
                         t1 = time.perf_counter()
                         if r:
-                            st.success(f"{n} → Probably prime ({t1-t0:.6f}s)")
-                            if n not in st.session_state["probable_primes"]:
-                                st.session_state["probable_primes"].append(n)
+                            st.success(f"{n} → {prime_label(n)} ({t1-t0:.6f}s)")
+                            prime_store.add(n)
+                        elif factor not in (None, n):
+                            st.error(f"{n} → Composite, divisible by {factor} ({t1-t0:.6f}s)")
+                            show_factorization(n)
                         else:
                             st.error(f"{n} → Composite ({t1-t0:.6f}s)")
+                            show_factorization(n)
+
+        # Random prime of a given size
+        elif mode == "Random Prime (bits)":
+            bits = st.select_slider("Prime size (bits)", [16, 32, 64, 128, 256, 512, 1024, 2048, 3072, 4096], value=512, key="gen_bits")
+            count = st.number_input("How many primes", min_value=1, max_value=10, value=2, key="gen_count")
+            kind = st.radio("Kind", ["Random", "Safe (p = 2q + 1)", "Strong (Gordon)"], horizontal=True, key="gen_kind")
+            if kind.startswith("Safe"):
+                st.caption("Safe primes are ~ln(p) times rarer: q and 2q + 1 are sieved together, "
+                           "but expect seconds at 1024 bits and minutes above 2048.")
+            generators = {"Random": generate_primes, "Safe": generate_safe_primes, "Strong": generate_strong_primes}
+            if st.button("Generate Primes", key="btn_gen_primes"):
+                if kind.startswith("Strong") and bits < STRONG_MIN_BITS:
+                    st.error(f"Strong primes need at least {STRONG_MIN_BITS} bits.")
+                elif kind.startswith("Safe") and bits < SAFE_MIN_BITS:
+                    st.error(f"Safe primes need at least {SAFE_MIN_BITS} bits.")
+                else:
+                    label = kind.split()[0]
+                    start_job("gen_job", f"Generate {count} × {bits}-bit {label.lower()} primes", generate_task,
+                              generators[label], bits, int(count), scan_pool)
+
+            gen_job = finished_job("gen_job")
+            if gen_job is not None and gen_job.status in (DONE, CANCELLED):
+                new_primes = gen_job.results  # already in the store
+                if gen_job.status == DONE:
+                    st.success(f"{gen_job.name}: done in {gen_job.elapsed():.4f}s")
+                else:
+                    st.warning(f"{gen_job.name} cancelled after {gen_job.elapsed():.1f}s — {len(new_primes)} found before that")
+                if new_primes:
+                    st.text_area("Generated primes", "\n\n".join(map(str, new_primes)), height=160)
 
     # show quick RSA button only when primes available
-    if len(st.session_state["probable_primes"]) >= 2:
+    if len(prime_store) >= 2:
         st.divider()
         st.write("You have primes stored in memory.")
         if st.button("Proceed to RSA Simulation (use generated primes)", key="goto_rsa"):
@@ -205,32 +423,51 @@ if st.session_state["current_page"] == "Large Prime Generation":
 elif st.session_state["current_page"] == "AKS vs Miller–Rabin Comparison":
     st.title("⚖️ AKS vs Miller–Rabin Algorithm Comparison")
     st.write("Enter a prime number to check and perform comparision of miller-rabbin and aks algorithms")
+    st.caption(f"AKS runs the full polynomial test: about 0.3s for a 5-digit prime and 3s at 7 digits, more than doubling "
+               f"with every digit, so inputs are limited to {AKS_MAX_DIGITS} digits. "
+               "The comparison runs in the background; cancelling takes effect after the current run.")
     num_s = st.text_input("Number to compare", key="comp_num")
     repeats = st.slider("Repetitions", 1, 10, 3, key="comp_reps")
     if st.button("Compare", key="btn_do_compare"):
         if not num_s.isdigit():
             st.error("Enter digits only.")
+        elif len(num_s.lstrip("0")) > AKS_MAX_DIGITS:
+            st.error(f"AKS is limited to {AKS_MAX_DIGITS} digits here; enter a smaller prime.")
         else:
             n = int(num_s)
-            with st.spinner("Comparing..."):
-                total_mr = total_aks = 0.0
-                for _ in range(repeats):
-                    t_mr, t_aks = compare_algorithms(n)
-                    if t_mr is None or t_aks is None:
-                        st.error("Comparison not available for this number.")
-                        break
-                    total_mr += t_mr; total_aks += t_aks
-                else:
-                    avg_mr = total_mr / repeats; avg_aks = total_aks / repeats
-                    st.success("Comparison done")
-                    fig, ax = plt.subplots(figsize=(6,4))
-                    bars = ax.bar(["Miller–Rabin", "AKS"], [avg_mr, avg_aks], color=["#4fc3f7","#ff7043"])
-                    ax.set_ylabel("Time (s)")
-                    ax.set_title(f"Average runtimes for n={n}")
-                    for bar,val in zip(bars,[avg_mr,avg_aks]):
-                        ax.text(bar.get_x()+bar.get_width()/2, bar.get_height(), f"{val:.6f}s", ha="center", va="bottom")
-                    ax.spines["top"].set_visible(False); ax.spines["right"].set_visible(False)
-                    st.pyplot(fig)
+            if not is_probable_prime(n):
+                st.error(f"{n} is not prime — comparison not available for this number.")
+            else:
+                st.session_state["compare_n"] = n
+                backends = (("Miller–Rabin", miller_rabin_test, 1), ("AKS", aks_test, 0))
+                start_job("compare_job", f"Compare n={n}", compare_task, n, repeats, backends)
+
+    compare_job = finished_job("compare_job")
+    if compare_job is not None and compare_job.status in (DONE, CANCELLED):
+        n = st.session_state["compare_n"]
+        stats = compare_job.value or {}
+        if compare_job.status == CANCELLED:
+            st.warning("Comparison cancelled" + (" — partial results below" if stats else ""))
+        if len(stats) == 2:
+            stats_mr, stats_aks = stats["Miller–Rabin"], stats["AKS"]
+            med_mr, med_aks = stats_mr["median_s"], stats_aks["median_s"]
+            st.success("Comparison done")
+            import matplotlib.pyplot as plt  # loaded only when a chart is drawn
+            fig, ax = plt.subplots(figsize=(6,4))
+            bars = ax.bar(["Miller–Rabin", "AKS"], [med_mr, med_aks], color=["#4fc3f7","#ff7043"])
+            ax.set_ylabel("Time (s)")
+            ax.set_title(f"Median runtimes for n={n}")
+            for bar,val in zip(bars,[med_mr,med_aks]):
+                ax.text(bar.get_x()+bar.get_width()/2, bar.get_height(), f"{val:.6f}s", ha="center", va="bottom")
+            ax.spines["top"].set_visible(False); ax.spines["right"].set_visible(False)
+            st.pyplot(fig)
+        if stats:
+            st.table({
+                "Algorithm": list(stats),
+                "Median (s)": [f"{r['median_s']:.6f}" for r in stats.values()],
+                "p95 (s)": [f"{r['p95_s']:.6f}" for r in stats.values()],
+                "Stdev (s)": [f"{r['stdev_s']:.6f}" for r in stats.values()],
+            })
 
 # -------------------------
 # PAGE 3: RSA Simulation
@@ -239,23 +476,25 @@ elif st.session_state["current_page"] == "RSA Simulation":
     st.title("🔐 RSA Simulation")
     st.write("Select two primes from memory or auto-select them.")
 
-    primes = st.session_state["probable_primes"]
-    # fallback to small_primes if probable_primes empty
-    if len(primes) < 2 and st.session_state["small_primes"]:
-        primes = st.session_state["small_primes"][:200]  # show a manageable slice
+    # the largest stored primes are the interesting ones for RSA
+    primes = prime_store.largest(200)
+    # fallback to the largest sieve primes if the store is empty
+    if len(primes) < 2 and len(st.session_state["small_primes"]) > 0:
+        primes = st.session_state["small_primes"][-200:]  # a view, no copy
 
     if len(primes) < 2:
         st.warning("Not enough primes in memory. Go to 'Large Prime Generation' and generate primes.")
     else:
         col1, col2 = st.columns(2)
         with col1:
-            p = st.selectbox("Select p", primes, key="rsa_p")
+            # widgets get a short plain-list window of the sequence
+            p = st.selectbox("Select p", primes.window(-200), key="rsa_p")
         with col2:
-            q = st.selectbox("Select q", [x for x in primes if x != p], key="rsa_q")
+            q = st.selectbox("Select q", primes.without(p).window(-200), key="rsa_q")
 
         if st.button("Generate RSA keys (from selected primes)", key="btn_rsa_from_selected"):
             try:
-                rsa = RSA(int(p), int(q))
+                rsa = RSA(int(p), int(q), validate=False)  # store and sieve hold tested primes
                 st.session_state["rsa"] = rsa
                 st.success("RSA keys created!")
                 st.write(f"Public (e,n): ({rsa.e}, {rsa.n})")
@@ -263,27 +502,58 @@ elif st.session_state["current_page"] == "RSA Simulation":
             except Exception as e:
                 st.error(f"Error generating RSA: {e}")
 
-        if st.button("Auto-select two primes and create RSA", key="btn_rsa_auto"):
+        n_primes = st.number_input("Primes in modulus (3+ = multi-prime RSA)", min_value=2, max_value=4, value=2, key="rsa_nprimes")
+        if st.button("Auto-select primes and create RSA", key="btn_rsa_auto"):
             # secure choice
-            if len(primes) >= 2:
-                p_auto = secrets.choice(primes)
-                q_auto = secrets.choice(primes)
-                while q_auto == p_auto:
-                    q_auto = secrets.choice(primes)
+            if len(primes) >= n_primes:
+                chosen = []
+                while len(chosen) < n_primes:
+                    r = secrets.choice(primes)
+                    if r not in chosen:
+                        chosen.append(r)
                 try:
-                    rsa = RSA(int(p_auto), int(q_auto))
+                    rsa = RSA(int(chosen[0]), int(chosen[1]), extra_primes=tuple(int(r) for r in chosen[2:]), validate=False)
                     st.session_state["rsa"] = rsa
-                    st.success(f"Auto-created RSA (p={p_auto}, q={q_auto})")
+                    st.success(f"Auto-created RSA (primes: {', '.join(map(str, chosen))})")
                     st.write(f"Public (e,n): ({rsa.e}, {rsa.n})")
                 except Exception as e:
                     st.error(f"Error: {e}")
+            else:
+                st.error(f"Need at least {n_primes} primes in memory.")
+
+    # Cryptographic-size keys without waiting for prime generation
+    st.divider()
+    st.subheader("Ready-made keypairs")
+    col_bits, col_n = st.columns(2)
+    with col_bits:
+        pool_bits = st.select_slider("Prime size (bits)", [512, 1024, 1536, 2048], value=1024, key="pool_bits")
+    with col_n:
+        pool_nprimes = st.number_input("Primes per modulus", min_value=2, max_value=4, value=2, key="pool_nprimes")
+    keypair_pool = get_keypair_pool(pool_bits, int(pool_nprimes))
+    if st.button("Take a ready keypair", key="btn_rsa_pool"):
+        with st.spinner("Waiting for a keypair..." if keypair_pool.depth == 0 else "Taking a keypair..."):
+            t0 = time.perf_counter()
+            rsa = keypair_pool.take(timeout=KEYPAIR_TAKE_TIMEOUT)
+            t1 = time.perf_counter()
+        if rsa is None:
+            st.error(f"No keypair ready within {KEYPAIR_TAKE_TIMEOUT:.0f}s — the pool is still refilling.")
+        else:
+            st.session_state["rsa"] = rsa
+            st.success(f"{rsa.n.bit_length()}-bit RSA keypair ready in {t1-t0:.4f}s")
+            st.write(f"Public (e,n): ({rsa.e}, {rsa.n})")
+    pool_stats = keypair_pool.stats()
+    st.caption(
+        f"Pool: {pool_stats['depth']}/{pool_stats['size']} ready · {pool_stats['in_flight']} refilling · "
+        f"{pool_stats['refill_rate']:.2f} keypairs/s · {pool_stats['mean_make_s']:.2f}s per keypair · "
+        f"{pool_stats['taken']} taken ({pool_stats['waits']} had to wait)"
+    )
 
     # Encrypt / Decrypt UI
     if st.session_state.get("rsa"):
         rsa_obj = st.session_state["rsa"]
         st.divider()
         st.subheader("Encrypt / Decrypt")
-        plain = st.text_input("Plaintext (alphanumeric):", key="rsa_plain")
+        plain = st.text_input("Plaintext (any text):", key="rsa_plain")
         if st.button("Encrypt message", key="btn_encrypt_msg"):
             try:
                 cipher_text = rsa_obj.encrypt(plain)
@@ -300,3 +570,69 @@ elif st.session_state["current_page"] == "RSA Simulation":
                 st.success(f"Decrypted: {dec}")
             except Exception as e:
                 st.error(f"Decrypt error: {e}")
+
+        # How long the toy modulus survives: factor n in the background
+        st.divider()
+        st.subheader("Break the modulus")
+        st.caption(f"n has {rsa_obj.n.bit_length()} bits. Trial division, Pollard–Brent rho, then ECM curves "
+                   "(on the worker processes when there are several cores) up to "
+                   f"B1 = {FACTOR_MAX_B1:,}; gives up after {FACTOR_JOB_TIME_LIMIT:.0f}s, cancel at any time.")
+        if st.button("Factor n", key="btn_factor_n"):
+            start_job("factor_job", f"Factor {rsa_obj.n.bit_length()}-bit n", factor_task, rsa_obj.n, scan_pool)
+        factor_job = finished_job("factor_job")
+        if factor_job is not None and factor_job.status in (DONE, CANCELLED):
+            result = factor_job.value
+            if factor_job.status == CANCELLED or result is None or not result["complete"]:
+                found = ", ".join(map(str, factor_job.results)) or "none"
+                verb = "cancelled" if factor_job.status == CANCELLED else "gave up"
+                st.warning(f"{factor_job.name} {verb} after {factor_job.elapsed():.1f}s — factors found: {found}")
+            elif result["n"] != rsa_obj.n:
+                st.caption(f"Last factorization was for an earlier modulus: {format_factors(result['factors'])}")
+            else:
+                st.success(f"n = {format_factors(result['factors'])} — factored in {result['seconds']:.3f}s")
+                if sorted(result["factors"]) == sorted(rsa_obj.primes):
+                    st.caption("These are exactly the secret primes: the private key can be rebuilt from them.")
+                st.table({
+                    "Step": [method for method, _, _ in result["steps"]],
+                    "Factor": [str(p) for _, p, _ in result["steps"]],
+                    "At (s)": [f"{t:.4f}" for _, _, t in result["steps"]],
+                })
+
+# ------------------------------------------------
+# Sidebar: sieve cache and job statistics (after the page ran)
+# ------------------------------------------------
+cache_stats = sieve_cache.stats()
+st.sidebar.caption(
+    f"Sieve cache: {cache_stats['hits']} hits · {cache_stats['misses']} misses · "
+    f"{cache_stats['coalesced']} shared · {cache_stats['entries']} entries · "
+    f"{cache_stats['bytes'] / 1e6:.1f} MB"
+)
+st.sidebar.caption(f"Background jobs active on this server: {job_runner.active_count()}")
+st.sidebar.caption(f"Big-integer backend: {BIGINT_BACKEND}" + ("" if BIGINT_BACKEND == "gmpy2" else " (pip install gmpy2 for GMP)"))
+
+# ------------------------------------------------
+# Sidebar: hot-path metrics (process-wide, opt-in)
+# ------------------------------------------------
+with st.sidebar.expander("Metrics"):
+    # the flag is process-wide: show its current state, change it only on user action
+    st.session_state["metrics_on"] = metrics.ENABLED
+    collect = st.toggle("Collect metrics (all sessions)", key="metrics_on",
+                        on_change=lambda: metrics.enable(st.session_state["metrics_on"]))
+    snap = metrics.snapshot()
+    if snap["counters"]:
+        st.table({"Counter": list(snap["counters"]), "Value": [f"{v:,}" for v in snap["counters"].values()]})
+    if snap["histograms"]:
+        st.table({
+            "Timer": list(snap["histograms"]),
+            "Calls": [f"{h['count']:,}" for h in snap["histograms"].values()],
+            "Mean (ms)": [f"{1e3 * h['sum'] / h['count']:.3f}" for h in snap["histograms"].values()],
+        })
+    if not (snap["counters"] or snap["histograms"]):
+        st.caption("Nothing recorded yet." if collect else "Off — instrumentation costs nothing until enabled.")
+    st.caption("Work done in process-pool workers is not counted.")
+    col_prom, col_json = st.columns(2)
+    col_prom.download_button("Prometheus", metrics.to_prometheus(snap), "metrics.prom", key="metrics_prom")
+    col_json.download_button("JSON", metrics.to_json(snap), "metrics.json", key="metrics_json")
+    if st.button("Reset metrics", key="metrics_reset"):
+        metrics.reset()
+        st.rerun()
@@ -0,0 +1,169 @@
+"""Non-interactive batch primality testing.
+
+Reads integers (one per line, '#' comments and blank lines ignored) from
+files or stdin as a stream, tests them in fixed-size batches and writes
+one result per input, in input order, as TSV or JSON Lines.  Only a
+bounded number of batches is held at once, so inputs of any size run in
+constant memory.  A throughput summary goes to stderr at the end.
+
+Usage:
+    python batch_check.py numbers.txt > results.tsv
+    seq 1 1000000 | python batch_check.py --format jsonl --workers 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+import metrics
+from primality import BATCH_LIMIT, BPSW, is_prime, is_probable_prime_batch, primality_mode
+
+DEFAULT_BATCH_SIZE = 4096
+
+
+# ----- Input -----
+def iter_lines(paths):
+    """Yield (source, line number, text) from each path; '-' is stdin."""
+    for path in paths:
+        if path == "-":
+            yield from (("-", i, line) for i, line in enumerate(sys.stdin, 1))
+        else:
+            with open(path) as f:
+                yield from ((path, i, line) for i, line in enumerate(f, 1))
+
+
+def iter_numbers(lines, errors=None):
+    """Parse integers from lines; unparsable lines are reported to `errors`."""
+    for source, lineno, line in lines:
+        text = line.split("#", 1)[0].strip()
+        if not text:
+            continue
+        try:
+            yield int(text)
+        except ValueError:
+            if errors is not None:
+                errors.write(f"{source}:{lineno}: not an integer: {text!r}\n")
+
+
+def iter_batches(items, size):
+    """Group an iterable into lists of at most `size` items."""
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+# ----- Testing -----
+def check_batch(numbers, extra_rounds=0):
+    """[(n, is_prime, certainty)] for a batch; inputs below 2**32 are tested as one array."""
+    small = [i for i, n in enumerate(numbers) if 0 <= n < BATCH_LIMIT]
+    flags = [None] * len(numbers)
+    if small:
+        mask = is_probable_prime_batch(np.array([numbers[i] for i in small], dtype=np.uint64))
+        for i, flag in zip(small, mask.tolist()):
+            flags[i] = flag
+    results = []
+    for n, flag in zip(numbers, flags):
+        if flag is None:
+            flag = is_prime(n, extra_rounds)
+        results.append((n, flag, "probable" if flag and primality_mode(n) == BPSW else "proven"))
+    return results
+
+
+def iter_results(batches, workers=1, extra_rounds=0):
+    """Test batches (on a process pool when workers > 1), yielding results in order."""
+    if workers <= 1:
+        for batch in batches:
+            yield from check_batch(batch, extra_rounds)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for batch in batches:
+            in_flight.append(pool.submit(check_batch, batch, extra_rounds))
+            if len(in_flight) >= 2 * workers:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+# ----- Output -----
+def write_tsv(results, out):
+    out.write("n\tprime\tcertainty\n")
+    for n, flag, certainty in results:
+        out.write(f"{n}\t{'true' if flag else 'false'}\t{certainty}\n")
+        yield flag
+
+
+def write_jsonl(results, out):
+    for n, flag, certainty in results:
+        out.write(json.dumps({"n": n, "prime": flag, "certainty": certainty}) + "\n")
+        yield flag
+
+
+WRITERS = {"tsv": write_tsv, "jsonl": write_jsonl}
+
+
+def run(paths, out, fmt="tsv", workers=1, batch_size=DEFAULT_BATCH_SIZE, extra_rounds=0, errors=None):
+    """Stream numbers from paths through the tester into out; returns (tested, primes)."""
+    numbers = iter_numbers(iter_lines(paths), errors)
+    results = iter_results(iter_batches(numbers, batch_size), workers, extra_rounds)
+    tested = primes = 0
+    for flag in WRITERS[fmt](results, out):
+        tested += 1
+        primes += flag
+    return tested, primes
+
+
+# ----- CLI -----
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test integers for primality in batch (one per line).")
+    parser.add_argument("inputs", nargs="*", default=["-"], help="input files ('-' or none: stdin)")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--format", choices=list(WRITERS), default="tsv")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (0: all cores)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="numbers per batch")
+    parser.add_argument("-k", "--extra-rounds", type=int, default=0,
+                        help="extra random Miller-Rabin rounds above 2**64")
+    parser.add_argument("--metrics", help="collect metrics and write them here (.json or Prometheus text)")
+    args = parser.parse_args(argv)
+    if args.batch_size < 1:
+        parser.error("--batch-size must be >= 1")
+    workers = args.workers or os.cpu_count() or 1
+    if args.metrics:
+        metrics.enable()
+
+    t0 = time.perf_counter()
+    try:
+        out = open(args.output, "w") if args.output else sys.stdout
+        try:
+            tested, primes = run(args.inputs, out, args.format, workers,
+                                 args.batch_size, args.extra_rounds, sys.stderr)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    except BrokenPipeError:
+        # downstream closed early (e.g. `| head`): stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - t0
+    if args.metrics:
+        metrics.write(args.metrics)
+    print(f"tested {tested} numbers ({primes} prime) in {elapsed:.3f}s "
+          f"({tested / max(elapsed, 1e-9):,.0f} numbers/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
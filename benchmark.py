@@ -0,0 +1,404 @@
+"""Benchmark suite for the project's primality backends.
+
+Every backend is timed on prime and composite inputs over a sweep of bit
+lengths, with warmup calls and repeated measurements reduced to
+mean/median/p95/stddev.  Results export to JSON or CSV.  A saved JSON run
+can be compared with a new one to flag regressions between releases.
+
+Cold-start time of each entry point is measured separately by importing
+it in fresh interpreters, and the big-integer backend (gmpy2 or stdlib)
+against the builtin pow.  The batch subcommand checks the vectorized
+Miller-Rabin path against the scalar one below 2**32 and times both.
+
+Usage:
+    python benchmark.py run --bits 16 32 64 128 --repeat 20 --json results.json
+    python benchmark.py compare baseline.json results.json --threshold 0.10
+    python benchmark.py imports --repeat 5
+    python benchmark.py bigint --bits 1024 2048 4096
+    python benchmark.py batch --bits 24 32
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from math import gcd
+
+from bigint_backend import BACKEND, invert, powmod
+from daa_1 import aks_test, miller_rabin_test
+from prime_core import is_probable_prime, sieve
+from primality import BATCH_LIMIT, is_prime, is_probable_prime_batch
+
+# Sieve lookups only make sense below the sieve limit
+SIEVE_LOOKUP_BITS = 24
+
+_lookup_primes = None
+
+
+def sieve_lookup(n):
+    """Membership test against a precomputed sieve (n < 2**SIEVE_LOOKUP_BITS)."""
+    global _lookup_primes
+    if _lookup_primes is None:
+        _lookup_primes = sieve(1 << SIEVE_LOOKUP_BITS)
+    return n in _lookup_primes  # binary search over the PrimeSequence
+
+
+# name -> (function, largest bit length it is benchmarked at)
+BACKENDS = {
+    "is_probable_prime": (is_probable_prime, None),
+    "miller_rabin_test": (miller_rabin_test, None),
+    "aks_test": (aks_test, 16),
+    "sieve_lookup": (sieve_lookup, SIEVE_LOOKUP_BITS),
+}
+
+KINDS = ("prime", "composite")
+
+
+# ----- Measurement -----
+def time_call(func, arg, repeat=10, warmup=2):
+    """Run func(arg) `warmup` times untimed, then return `repeat` timings."""
+    for _ in range(warmup):
+        func(arg)
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(arg)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def percentile(samples, q):
+    """q-th percentile (0-100) with linear interpolation."""
+    ordered = sorted(samples)
+    pos = (len(ordered) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def summarize(samples):
+    """Summary statistics (seconds) of a list of timings."""
+    return {
+        "runs": len(samples),
+        "mean_s": statistics.fmean(samples),
+        "median_s": statistics.median(samples),
+        "p95_s": percentile(samples, 95),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "min_s": min(samples),
+        "max_s": max(samples),
+    }
+
+
+# ----- Inputs -----
+def _random_prime(bits, rng):
+    """A random prime of exactly `bits` bits with the top two bits set."""
+    while True:
+        n = rng.getrandbits(bits) | (3 << (bits - 2)) | 1
+        if is_prime(n):
+            return n
+
+
+def make_input(bits, kind, rng):
+    """A random odd number of exactly `bits` bits that is prime or composite.
+
+    Composites are semiprimes p*q of two roughly half-size primes, the
+    hard case for every test (a random odd composite usually has a small
+    factor that trial division finds at once).
+    """
+    if kind != "prime":
+        if bits < 4:
+            raise ValueError("bits must be >= 4 for composite inputs.")
+        # the top two bits of each factor set: p*q has exactly `bits` bits
+        return _random_prime(bits // 2, rng) * _random_prime(bits - bits // 2, rng)
+    if bits < 3:
+        raise ValueError("bits must be >= 3.")
+    while True:
+        n = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+        if is_prime(n):
+            return n
+
+
+# ----- Sweep -----
+def run_sweep(backends=None, bit_sizes=(16, 32, 64, 128), kinds=KINDS,
+              inputs_per_size=3, repeat=10, warmup=2, seed=0):
+    """Benchmark every backend at every bit size; returns a list of records."""
+    rng = random.Random(seed)
+    names = list(backends or BACKENDS)
+    records = []
+    for bits in bit_sizes:
+        for kind in kinds:
+            inputs = [make_input(bits, kind, rng) for _ in range(inputs_per_size)]
+            for name in names:
+                func, max_bits = BACKENDS[name]
+                if max_bits is not None and bits > max_bits:
+                    continue
+                samples = []
+                for n in inputs:
+                    samples += time_call(func, n, repeat, warmup)
+                records.append({"backend": name, "bits": bits, "kind": kind, **summarize(samples)})
+    return records
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+# ----- Cold start -----
+# Modules people run or import directly; "app" is imported in Streamlit's
+# bare mode (no server), which executes the first page once
+ENTRY_POINTS = ("primality", "rsa_simulation", "rsa_stream", "batch_check",
+                "daa_project", "daa_1", "prime_bitmap", "benchmark", "app")
+
+# Dependencies worth loading only when needed
+HEAVY_MODULES = ("numpy", "matplotlib", "sympy", "streamlit")
+
+# Prints "<seconds> <heavy,modules>" as its last line (the import itself may print)
+_IMPORT_PROBE = (
+    "import sys, time; t0 = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t0, ','.join(m for m in {heavy!r} if m in sys.modules) or '-')"
+)
+
+
+def time_import(module, repeat=5):
+    """Import `module` in `repeat` fresh interpreters.
+
+    Returns the summary of the import times plus the heavy modules the
+    import pulled in.  Runs in a scratch directory so entry points that
+    create files (the app's prime store) leave nothing behind.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=here + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    samples, loaded = [], ""
+    with tempfile.TemporaryDirectory() as scratch:
+        for _ in range(repeat):
+            proc = subprocess.run(
+                [sys.executable, "-c", _IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                cwd=scratch, env=env, capture_output=True, text=True, check=True,
+            )
+            seconds, loaded = proc.stdout.strip().splitlines()[-1].split()
+            samples.append(float(seconds))
+    return {"module": module, "heavy": loaded, **summarize(samples)}
+
+
+# ----- Big-integer backend -----
+def time_bigint(bits, repeat=10, seed=0):
+    """Median powmod / invert times at `bits` bits: selected backend vs builtin pow."""
+    rng = random.Random(seed)
+    m = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+    a, e = rng.randrange(2, m), rng.getrandbits(bits)
+    while gcd(a, m) != 1:
+        a = rng.randrange(2, m)
+    ops = {
+        "powmod": (lambda x: powmod(a, e, x), lambda x: pow(a, e, x)),
+        "invert": (lambda x: invert(a, x), lambda x: pow(a, -1, x)),
+    }
+    records = []
+    for op, (ours, builtin) in ops.items():
+        median = summarize(time_call(ours, m, repeat))["median_s"]
+        base = summarize(time_call(builtin, m, repeat))["median_s"]
+        records.append({"op": op, "bits": bits, "backend": BACKEND, "median_s": median,
+                        "builtin_median_s": base, "speedup": base / median if median else float("inf")})
+    return records
+
+
+# ----- Batch Miller-Rabin -----
+# Base primes for the scan_range window that forces its batch path
+# (they stop short of isqrt(end), so survivors are not proven)
+BATCH_CHECK_SIEVE = [3, 5, 7, 11, 13]
+
+
+def check_batch(bits, count=1 << 16, seed=0):
+    """Batch vs scalar primality below 2**bits (bits <= 32): mismatches and timings.
+
+    Two inputs: `count` random integers through is_probable_prime_batch
+    and is_prime, and a window of `count` numbers through scan_range with
+    too few base primes (batch path) and with the default ones (proven
+    by the sieve).
+    """
+    import numpy as np  # only this subcommand needs NumPy
+
+    from range_scan import scan_range
+
+    if not 2 <= bits <= BATCH_LIMIT.bit_length() - 1:
+        raise ValueError(f"bits must be in [2, {BATCH_LIMIT.bit_length() - 1}].")
+    rng = random.Random(seed)
+    values = [rng.getrandbits(bits) for _ in range(count)]
+    t0 = time.perf_counter()
+    batch = is_probable_prime_batch(np.array(values, dtype=np.uint64)).tolist()
+    t1 = time.perf_counter()
+    scalar = [is_prime(v) for v in values]
+    t2 = time.perf_counter()
+
+    lo = rng.randrange(max((1 << bits) - count, 1))
+    hi = min(lo + count - 1, (1 << bits) - 1)
+    t3 = time.perf_counter()
+    via_batch = scan_range(lo, hi, BATCH_CHECK_SIEVE)
+    t4 = time.perf_counter()
+    via_sieve = scan_range(lo, hi)
+    t5 = time.perf_counter()
+    return {
+        "bits": bits, "count": count,
+        "mismatches": sum(a != b for a, b in zip(batch, scalar)),
+        "batch_s": t1 - t0, "scalar_s": t2 - t1,
+        "range": (lo, hi), "range_primes": len(via_sieve), "range_match": via_batch == via_sieve,
+        "range_batch_s": t4 - t3, "range_sieve_s": t5 - t4,
+    }
+
+
+# ----- Export -----
+def write_json(records, path):
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": records}, f, indent=2)
+
+
+def write_csv(records, path):
+    if not records:
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(records[0]))
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def load_json(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+# ----- Regression comparison -----
+def compare(baseline, current, threshold=0.10, metric="median_s"):
+    """Match records by (backend, bits, kind) and report relative changes.
+
+    Returns a list of dicts with the baseline and current metric, their
+    ratio, and whether the slowdown exceeds `threshold`.
+    """
+    base = {(r["backend"], r["bits"], r["kind"]): r for r in baseline}
+    rows = []
+    for r in current:
+        key = (r["backend"], r["bits"], r["kind"])
+        if key not in base:
+            continue
+        old, new = base[key][metric], r[metric]
+        ratio = new / old if old else float("inf")
+        rows.append({
+            "backend": key[0], "bits": key[1], "kind": key[2],
+            "baseline": old, "current": new, "ratio": ratio,
+            "regression": ratio > 1 + threshold,
+        })
+    return rows
+
+
+# ----- CLI -----
+def print_table(records):
+    print(f"{'Backend':<20}{'Bits':>6}  {'Kind':<10}{'Median (s)':>12}{'p95 (s)':>12}{'Stdev (s)':>12}")
+    print("-" * 72)
+    for r in records:
+        print(f"{r['backend']:<20}{r['bits']:>6}  {r['kind']:<10}"
+              f"{r['median_s']:>12.6f}{r['p95_s']:>12.6f}{r['stdev_s']:>12.6f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the primality backends.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run a bit-length sweep")
+    run.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=None)
+    run.add_argument("--bits", nargs="+", type=int, default=[16, 32, 64, 128, 256])
+    run.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    run.add_argument("--inputs", type=int, default=3, help="inputs per bit size and kind")
+    run.add_argument("--repeat", type=int, default=10)
+    run.add_argument("--warmup", type=int, default=2)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--json", help="write results as JSON")
+    run.add_argument("--csv", help="write results as CSV")
+
+    imports = sub.add_parser("imports", help="measure cold-start import time of the entry points")
+    imports.add_argument("modules", nargs="*", default=list(ENTRY_POINTS))
+    imports.add_argument("--repeat", type=int, default=5)
+    imports.add_argument("--json", help="write results as JSON")
+
+    bigint = sub.add_parser("bigint", help=f"time powmod/invert on the big-integer backend ({BACKEND})")
+    bigint.add_argument("--bits", nargs="+", type=int, default=[512, 1024, 2048, 4096])
+    bigint.add_argument("--repeat", type=int, default=10)
+    bigint.add_argument("--json", help="write results as JSON")
+
+    batch = sub.add_parser("batch", help="check batch Miller-Rabin against the scalar test (below 2**32)")
+    batch.add_argument("--bits", nargs="+", type=int, default=[16, 24, 32])
+    batch.add_argument("--count", type=int, default=1 << 16, help="random inputs and window size per bit size")
+    batch.add_argument("--seed", type=int, default=0)
+
+    cmp_ = sub.add_parser("compare", help="compare two JSON runs")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("current")
+    cmp_.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown (0.10 = 10%%)")
+    cmp_.add_argument("--metric", default="median_s", choices=["median_s", "mean_s", "p95_s", "min_s"])
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        records = run_sweep(args.backends, args.bits, args.kinds, args.inputs,
+                            args.repeat, args.warmup, args.seed)
+        print_table(records)
+        if args.json:
+            write_json(records, args.json)
+        if args.csv:
+            write_csv(records, args.csv)
+        return 0
+
+    if args.command == "imports":
+        records = [time_import(m, args.repeat) for m in args.modules]
+        print(f"{'Module':<16}{'Median (s)':>12}{'Min (s)':>10}  Heavy deps loaded")
+        print("-" * 72)
+        for r in records:
+            print(f"{r['module']:<16}{r['median_s']:>12.3f}{r['min_s']:>10.3f}  {r['heavy']}")
+        if args.json:
+            write_json(records, args.json)
+        return 0
+
+    if args.command == "bigint":
+        records = [r for bits in args.bits for r in time_bigint(bits, args.repeat)]
+        print(f"{'Op':<8}{'Bits':>6}  {'Backend':<8}{'Median (s)':>12}{'pow (s)':>12}{'Speedup':>9}")
+        print("-" * 57)
+        for r in records:
+            print(f"{r['op']:<8}{r['bits']:>6}  {r['backend']:<8}{r['median_s']:>12.6f}"
+                  f"{r['builtin_median_s']:>12.6f}{r['speedup']:>8.2f}x")
+        if args.json:
+            write_json(records, args.json)
+        return 0
+
+    if args.command == "batch":
+        records = [check_batch(bits, args.count, args.seed) for bits in args.bits]
+        print(f"{'Bits':>4}{'Mismatch':>10}{'Batch (s)':>11}{'Scalar (s)':>12}"
+              f"{'Primes':>8}{'Range':>7}{'Batch (s)':>11}{'Sieve (s)':>11}")
+        print("-" * 74)
+        for r in records:
+            print(f"{r['bits']:>4}{r['mismatches']:>10}{r['batch_s']:>11.4f}{r['scalar_s']:>12.4f}"
+                  f"{r['range_primes']:>8}{'same' if r['range_match'] else 'DIFF':>7}"
+                  f"{r['range_batch_s']:>11.4f}{r['range_sieve_s']:>11.4f}")
+        return 1 if any(r["mismatches"] or not r["range_match"] for r in records) else 0
+
+    rows = compare(load_json(args.baseline), load_json(args.current), args.threshold, args.metric)
+    regressions = [r for r in rows if r["regression"]]
+    for r in rows:
+        flag = "REGRESSION" if r["regression"] else ""
+        print(f"{r['backend']:<20}{r['bits']:>6}  {r['kind']:<10}"
+              f"{r['baseline']:>12.6f}{r['current']:>12.6f}{r['ratio']:>8.2f}x  {flag}")
+    print(f"{len(regressions)} regression(s) over {args.threshold:.0%} in {len(rows)} comparisons.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Big-integer arithmetic backend.
+
+GMP through gmpy2 when it is installed, the standard library otherwise.
+The choice is made once, at import time; set PRIME_BIGINT=python to force
+the standard library (e.g. to compare the two).  Every function takes and
+returns plain Python ints, so call sites are the same on both backends.
+
+    from bigint_backend import BACKEND, invert, powmod
+"""
+
+import math
+import os
+
+try:
+    if os.environ.get("PRIME_BIGINT", "").lower() == "python":
+        raise ImportError
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+BACKEND = "python" if gmpy2 is None else "gmpy2"
+
+# Below this modulus size the conversions to and from mpz cost more than
+# GMP saves, so powmod stays on the builtin pow
+GMP_MIN_BITS = 128
+
+
+# ----- Standard library -----
+def _iroot(n, k):
+    """(floor of the k-th root of n >= 0, whether it is exact) by integer Newton iteration."""
+    if n < 0 or k < 1:
+        raise ValueError("iroot needs n >= 0 and k >= 1.")
+    if n < 2:
+        return n, True
+    x = 1 << -(-n.bit_length() // k)  # >= the true root
+    while True:
+        y = ((k - 1) * x + n // x ** (k - 1)) // k
+        if y >= x:
+            return x, x ** k == n
+        x = y
+
+
+def _next_prime(n):
+    """Smallest prime > n (probable prime above 2**64, see primality.is_prime)."""
+    from primality import is_prime  # primality imports this module
+
+    if n < 2:
+        return 2
+    candidate = (n + 1) | 1
+    while not is_prime(candidate):
+        candidate += 2
+    return candidate
+
+
+# ----- Selected backend -----
+if gmpy2 is None:
+    def powmod(a, e, m):
+        """a**e mod m."""
+        return pow(a, e, m)
+
+    def invert(a, m):
+        """a**-1 mod m; ValueError when a is not invertible."""
+        return pow(a, -1, m)
+
+    gcd = math.gcd
+    isqrt = math.isqrt
+    iroot = _iroot
+    next_prime = _next_prime
+
+else:
+    def powmod(a, e, m):
+        """a**e mod m."""
+        if m.bit_length() < GMP_MIN_BITS:
+            return pow(a, e, m)
+        return int(gmpy2.powmod(a, e, m))
+
+    def invert(a, m):
+        """a**-1 mod m; ValueError when a is not invertible."""
+        try:
+            x = int(gmpy2.invert(a, m))
+        except ZeroDivisionError:
+            x = 0
+        if x == 0 and abs(m) != 1:
+            raise ValueError("base is not invertible for the given modulus")
+        return x
+
+    def gcd(*values):
+        return int(gmpy2.gcd(*values))
+
+    def isqrt(n):
+        return int(gmpy2.isqrt(n))
+
+    def iroot(n, k):
+        """(floor of the k-th root of n >= 0, whether it is exact)."""
+        root, exact = gmpy2.iroot(n, k)
+        return int(root), bool(exact)
+
+    def next_prime(n):
+        """Smallest probable prime > n."""
+        return int(gmpy2.next_prime(n))
@@ -0,0 +1,67 @@
+"""Compact binary container for RSA ciphertext blocks.
+
+Layout (all integers big-endian):
+
+    magic   4 bytes   b"RSAC"
+    version 1 byte    1
+    width   4 bytes   bytes per block (byte length of the modulus)
+    count   8 bytes   number of blocks
+    blocks  count * width bytes, each a fixed-width ciphertext integer
+
+The armored form is the same bytes in base64, for text boxes.  Encoding
+uses int.to_bytes and decoding slices a memoryview, so both are linear in
+the ciphertext size (unlike decimal conversion of big ints).
+"""
+
+import base64
+import binascii
+import struct
+
+MAGIC = b"RSAC"
+VERSION = 1
+HEADER = struct.Struct(">4sBIQ")
+
+
+def block_width(n):
+    """Bytes needed for one ciphertext block under modulus n."""
+    return (n.bit_length() + 7) // 8
+
+
+def pack(blocks, n, armor=False):
+    """Serialize ciphertext blocks for modulus n (base64 str if armor)."""
+    width = block_width(n)
+    out = bytearray(HEADER.pack(MAGIC, VERSION, width, len(blocks)))
+    for c in blocks:
+        out += c.to_bytes(width, "big")
+    if armor:
+        return base64.b64encode(out).decode("ascii")
+    return bytes(out)
+
+
+def read_header(data, offset=0):
+    """Parse a header at `offset`; returns (width, count, payload_offset)."""
+    if len(data) - offset < HEADER.size:
+        raise ValueError("Ciphertext is truncated (no header).")
+    magic, version, width, count = HEADER.unpack_from(data, offset)
+    if magic != MAGIC:
+        raise ValueError("Not an RSA ciphertext container.")
+    if version != VERSION:
+        raise ValueError(f"Unsupported ciphertext version {version}.")
+    if width == 0:
+        raise ValueError("Invalid block width 0.")
+    return width, count, offset + HEADER.size
+
+
+def unpack(data):
+    """Parse a container (raw bytes or armored str); returns (width, blocks)."""
+    if isinstance(data, str):
+        try:
+            data = base64.b64decode("".join(data.split()), validate=True)
+        except binascii.Error:
+            raise ValueError("Ciphertext is not valid base64.") from None
+    view = memoryview(data)
+    width, count, offset = read_header(view)
+    if len(view) - offset != width * count:
+        raise ValueError("Ciphertext length does not match its header.")
+    blocks = [int.from_bytes(view[i:i + width], "big") for i in range(offset, len(view), width)]
+    return width, blocks
@@ -7,7 +7,7 @@ Original file is located at
     https://colab.research.google.com/drive/10toQtNfntSRwGiMEoOF1URacP_98kfEY
 """
 
-# pip install sympy matplotlib
+# pip install matplotlib
 
 # ==============================================
 #  Cryptographic Prime Project - Member 2
@@ -17,62 +17,39 @@ Original file is located at
 
 import random
 import time
-import matplotlib.pyplot as plt
-from math import gcd, isqrt
-from sympy import isprime
+
+from primality import deterministic_bases, is_prime, strong_probable_prime
 
 # -------------------------------------------------
 # Function 1: Miller-Rabin Primality Test
 # -------------------------------------------------
 def miller_rabin_test(n, k=5):
-    """Miller-Rabin probabilistic primality test."""
+    """Miller-Rabin test: fixed deterministic bases below 2^64, k random bases above."""
     if n <= 1 or n == 4:
         return False
     if n <= 3:
         return True
+    if n % 2 == 0:
+        return False
 
-    # Step 1: Write n-1 as 2^r * d
-    d = n - 1
-    r = 0
-    while d % 2 == 0:
-        d //= 2
-        r += 1
-
-    # Step 2: Test k rounds
-    for _ in range(k):
-        a = random.randint(2, n - 2)
-        x = pow(a, d, n)
-
-        if x == 1 or x == n - 1:
-            continue
+    # Step 1: Pick the bases (exact for n < 2^64)
+    bases = deterministic_bases(n)
+    if bases is None:
+        bases = [random.randint(2, n - 2) for _ in range(k)]
 
-        for _ in range(r - 1):
-            x = pow(x, 2, n)
-            if x == n - 1:
-                break
-        else:
-            return False
-    return True
+    # Step 2: One strong test per base
+    return all(strong_probable_prime(n, a) for a in bases)
 
 
 # -------------------------------------------------
-# Function 2: AKS Algorithm (simplified deterministic version)
+# Function 2: AKS Algorithm (full polynomial version, see aks.py)
 # -------------------------------------------------
 def aks_test(n):
-    """Simplified AKS primality test using sympy for deterministic checking."""
-    if n <= 1:
-        return False
-    if n <= 3:
-        return True
+    """AKS deterministic primality test (perfect-power check, order-r search
+    and the (X+a)^n congruences mod (X^r - 1, n))."""
+    from aks import is_prime_aks  # NumPy is only needed once AKS actually runs
 
-    # Step 1: Check if n is a perfect power
-    for b in range(2, isqrt(n) + 1):
-        a = round(n ** (1 / b))
-        if a ** b == n:
-            return False
-
-    # Step 2: Deterministic prime check
-    return isprime(n)
+    return is_prime_aks(n)
 
 
 # -------------------------------------------------
@@ -85,7 +62,7 @@ def compare_algorithms(n):
     print("==============================")
 
     # Check if the number is prime first
-    if not isprime(n):
+    if not is_prime(n):
         print(f"\n⚠️ {n} is NOT a prime number. Comparison skipped.")
         print("Please enter a prime number for comparison.")
         return None, None
@@ -124,6 +101,8 @@ def compare_algorithms(n):
 # -------------------------------------------------
 def show_graph(n, time_mr, time_aks):
     """Displays a bar graph comparing execution times."""
+    import matplotlib.pyplot as plt  # heavy; only the graph needs it
+
     algorithms = ['Miller–Rabin', 'AKS']
     times = [time_mr, time_aks]
 
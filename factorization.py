@@ -0,0 +1,424 @@
+"""Integer factorization: trial division, Pollard-Brent rho and ECM.
+
+factorize() strips small prime factors with batch trial division, then
+splits each remaining composite cofactor with Pollard's rho (Brent's
+cycle finding, one gcd per batch of steps) and, when rho runs out of
+budget, with Lenstra's elliptic curve method on Montgomery curves
+(Suyama parametrization, x-only ladder for stage 1 and a baby-step /
+giant-step stage 2).  ECM curves are independent, so they can be fanned
+out over a process pool.
+
+    python factorization.py 1000000016000000063 --workers 4
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from math import gcd
+
+import numpy as np
+
+import metrics
+from bigint_backend import invert, iroot
+from primality import is_prime
+from segmented_sieve import base_primes, iter_prime_segments
+from trial_division import TrialDivisor
+
+# Base primes for trial division when no divisor is supplied
+TRIAL_LIMIT = 1 << 16
+
+# Rho steps per attempt, and steps between gcds
+RHO_ITERATIONS = 1 << 18
+RHO_BATCH = 128
+RHO_ATTEMPTS = 3
+
+# (B1, curves) per ECM level, in the order they are tried
+ECM_SCHEDULE = ((2_000, 25), (11_000, 90), (50_000, 300), (250_000, 700), (1_000_000, 1800))
+
+# Stage 2 bound as a multiple of B1, and the giant-step width
+ECM_B2_FACTOR = 50
+ECM_WHEEL = 2310
+
+# Seconds between stop checks while waiting on pooled curves
+STOP_POLL = 0.2
+
+_divisor = None
+_multipliers = {}
+_plans = {}
+
+
+def _default_divisor():
+    global _divisor
+    if _divisor is None:
+        _divisor = TrialDivisor(base_primes(TRIAL_LIMIT))
+    return _divisor
+
+
+# ----- Pollard-Brent rho -----
+def pollard_brent(n, max_iterations=RHO_ITERATIONS, seed=None, stop=None):
+    """A nontrivial factor of composite n, or None after max_iterations steps.
+
+    Products of |x - y| are accumulated for RHO_BATCH steps before each
+    gcd; if a batch overshoots (gcd == n) it is replayed one step at a time.
+    `stop` is polled once per batch; returning True gives up.
+    """
+    if n % 2 == 0:
+        return 2
+    rng = random.Random(seed)
+    y, c = rng.randrange(1, n), rng.randrange(1, n)
+    g = r = q = 1
+    while g == 1:
+        x = y
+        for _ in range(r):
+            y = (y * y + c) % n
+        k = 0
+        while k < r and g == 1:
+            ys = y
+            for _ in range(min(RHO_BATCH, r - k)):
+                y = (y * y + c) % n
+                q = q * abs(x - y) % n
+            g = gcd(q, n)
+            k += RHO_BATCH
+            if g == 1 and stop is not None and stop():
+                return None
+        r *= 2
+        if g == 1 and r > max_iterations:
+            return None
+    if g == n:
+        while True:
+            ys = (ys * ys + c) % n
+            g = gcd(abs(x - ys), n)
+            if g > 1:
+                break
+    return g if g != n else None
+
+
+# ----- Montgomery curve arithmetic (x-only, projective X:Z) -----
+def _dbl(x, z, n, a24):
+    s = (x + z) * (x + z) % n
+    d = (x - z) * (x - z) % n
+    t = s - d
+    return s * d % n, t * (d + a24 * t) % n
+
+
+def _add(xp, zp, xq, zq, xd, zd, n):
+    """P + Q given the difference P - Q = (xd:zd)."""
+    u = (xp - zp) * (xq + zq)
+    v = (xp + zp) * (xq - zq)
+    s, d = u + v, u - v
+    return zd * s * s % n, xd * d * d % n
+
+
+def _ladder(k, x, z, n, a24):
+    """[k](x:z) for k >= 1 by the Montgomery ladder."""
+    x0, z0 = x, z
+    x1, z1 = _dbl(x, z, n, a24)
+    for bit in bin(k)[3:]:
+        if bit == "1":
+            x0, z0 = _add(x1, z1, x0, z0, x, z, n)
+            x1, z1 = _dbl(x1, z1, n, a24)
+        else:
+            x1, z1 = _add(x1, z1, x0, z0, x, z, n)
+            x0, z0 = _dbl(x0, z0, n, a24)
+    return x0, z0
+
+
+def _stage1_multiplier(b1):
+    """Product of the largest powers of each prime <= b1 that stay <= b1."""
+    k = _multipliers.get(b1)
+    if k is None:
+        k = 1
+        for p in base_primes(b1).tolist():
+            pe = p
+            while pe * p <= b1:
+                pe *= p
+            k *= pe
+        _multipliers[b1] = k
+    return k
+
+
+def _stage2_plan(b1, b2):
+    """(ms, starts, js): every prime q in (max(b1, W/2), b2] is m*W +- j with j <= W/2.
+
+    ms holds the giant steps m in increasing order and js the baby steps
+    j of step ms[i] in js[starts[i]:starts[i + 1]]; kept as NumPy arrays
+    (a few bytes per prime) rather than per-group Python lists.
+    """
+    key = (b1, b2)
+    plan = _plans.get(key)
+    if plan is None:
+        # (m, j) is stored at index (m*W + j) // 2 (j is odd); m*W - j and
+        # m*W + j share one cross term, so each pair is kept once
+        seen = np.zeros((b2 + ECM_WHEEL) // 2 + 1, dtype=bool)
+        # primes <= W/2 would need m = 0, the point at infinity
+        for q in iter_prime_segments(b2, max(b1, ECM_WHEEL // 2) + 1):
+            q = q.astype(np.int64)
+            m = (q + ECM_WHEEL // 2) // ECM_WHEEL
+            seen[(m * ECM_WHEEL + np.abs(q - m * ECM_WHEEL)) // 2] = True
+        pairs = np.flatnonzero(seen) * 2 + 1
+        del seen
+        m, j = pairs // ECM_WHEEL, pairs % ECM_WHEEL
+        starts = np.flatnonzero(np.diff(m, prepend=-1))
+        plan = _plans[key] = (m[starts], np.append(starts, j.size), j.astype(np.int32))
+    return plan
+
+
+def _stage2(x, z, n, a24, plan):
+    """Product over the stage 2 primes of the cross terms, for one gcd."""
+    ms, starts, js = plan
+    if ms.size == 0:
+        return 1
+    # baby steps [j]Q for odd j <= W/2: [j] = [j - 2] + [2], difference [j - 4]
+    x2, z2 = _dbl(x, z, n, a24)
+    babies = {1: (x, z), 3: _add(x2, z2, x, z, x, z, n)}
+    for j in range(5, ECM_WHEEL // 2 + 1, 2):
+        xp, zp = babies[j - 4]
+        xc, zc = babies[j - 2]
+        babies[j] = _add(xc, zc, x2, z2, xp, zp, n)
+    # giant steps [m*W]Q: [m + 1] = [m] + [1], difference [m - 1]; from
+    # m = 1 the difference would be [0]Q (infinity), so [2] is a doubling
+    xg, zg = _ladder(ECM_WHEEL, x, z, n, a24)
+    m = int(ms[0])
+    prev = _ladder((m - 1) * ECM_WHEEL, x, z, n, a24) if m > 1 else None
+    cur = _ladder(m * ECM_WHEEL, x, z, n, a24)
+    acc = 1
+    bounds = starts.tolist()
+    for i, target in enumerate(ms.tolist()):
+        while m < target:
+            if m == 1:
+                prev, cur = cur, _dbl(cur[0], cur[1], n, a24)
+            else:
+                prev, cur = cur, _add(cur[0], cur[1], xg, zg, prev[0], prev[1], n)
+            m += 1
+        xt, zt = cur
+        for j in js[bounds[i]:bounds[i + 1]].tolist():
+            xj, zj = babies[j]
+            acc = acc * (xt * zj - xj * zt) % n
+    return acc
+
+
+# ----- ECM -----
+def ecm_curve(n, b1, b2=None, sigma=None):
+    """Run one Suyama curve on n: a nontrivial factor, or None."""
+    if b2 is None:
+        b2 = ECM_B2_FACTOR * b1
+    if sigma is None:
+        sigma = random.randrange(6, max(n - 1, 7))
+    u = (sigma * sigma - 5) % n
+    v = 4 * sigma % n
+    x, z = pow(u, 3, n), pow(v, 3, n)
+    den = 16 * x * v % n
+    g = gcd(den, n)
+    if g > 1:
+        return g if g < n else None
+    a24 = pow(v - u, 3, n) * (3 * u + v) * invert(den, n) % n
+
+    x, z = _ladder(_stage1_multiplier(b1), x, z, n, a24)
+    g = gcd(z, n)
+    if g == 1 and b2 > b1:
+        g = gcd(_stage2(x, z, n, a24, _stage2_plan(b1, b2)), n)
+    return g if 1 < g < n else None
+
+
+def _ecm_curves(n, b1, b2, count):
+    """Worker: up to `count` curves; the first factor found, or None."""
+    for _ in range(count):
+        d = ecm_curve(n, b1, b2)
+        if d:
+            return d
+    return None
+
+
+def ecm(n, b1, curves, b2=None, workers=1, pool=None, stop=None):
+    """A nontrivial factor of composite n from up to `curves` curves, or None.
+
+    Curves run in this process, or one per task on `workers` processes
+    (or an existing `pool`), with at most 2 * workers in flight.  `stop`
+    is polled between curves; returning True abandons the search.
+    """
+    if b2 is None:
+        b2 = ECM_B2_FACTOR * b1
+    if n % 2 == 0:
+        return 2
+    timed = metrics.ENABLED
+    if pool is None and workers <= 1:
+        for _ in range(curves):
+            if stop is not None and stop():
+                return None
+            if timed:
+                metrics.inc("ecm_curves_total")
+            d = ecm_curve(n, b1, b2)
+            if d:
+                return d
+        return None
+
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    pending = set()
+    started = 0
+    try:
+        while started < curves or pending:
+            while started < curves and len(pending) < 2 * workers:
+                pending.add(pool.submit(_ecm_curves, n, b1, b2, 1))
+                started += 1
+            done, pending = wait(pending, timeout=STOP_POLL, return_when=FIRST_COMPLETED)
+            if timed:
+                metrics.inc("ecm_curves_total", len(done))
+            for future in done:
+                d = future.result()
+                if d:
+                    return d
+            if stop is not None and stop():
+                return None
+        return None
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+# ----- Full factorization -----
+def _perfect_power(n):
+    """(root, exponent) with the largest exponent if n is a perfect power, else None."""
+    for b in range(n.bit_length(), 1, -1):
+        a, exact = iroot(n, b)
+        if a >= 2 and exact:
+            return a, b
+    return None
+
+
+def factorize(n, divisor=None, workers=1, pool=None, time_limit=None, stop=None, on_factor=None,
+              max_b1=None):
+    """Factor n >= 1 into primes.
+
+    Returns a dict with the sorted prime factors (with multiplicity),
+    any composite cofactors left when time ran out or `stop` returned
+    True ("unfactored"), whether the factorization is complete, the
+    elapsed seconds and the steps taken (method, factor, seconds).
+    `divisor` is a TrialDivisor (default: primes below TRIAL_LIMIT);
+    ECM curves run on `workers` processes or on `pool`, skipping the
+    ECM_SCHEDULE levels with B1 above `max_b1`.  `on_factor(p)` is called
+    for each prime factor as it is found.
+    """
+    if n < 1:
+        raise ValueError("n must be a positive integer.")
+    t0 = time.perf_counter()
+    deadline = None if time_limit is None else t0 + time_limit
+
+    def halted():
+        return (deadline is not None and time.perf_counter() > deadline) or (stop is not None and stop())
+
+    factors, unfactored, steps = [], [], []
+
+    def found(p, method, times=1):
+        factors.extend([p] * times)
+        steps.append((method, p, time.perf_counter() - t0))
+        if on_factor is not None:
+            for _ in range(times):
+                on_factor(p)
+
+    if divisor is None:
+        divisor = _default_divisor()
+    m = n
+    while m > 1:
+        p = divisor.smallest_factor(m)
+        if p is None:
+            break
+        e = 0
+        while m % p == 0:
+            m //= p
+            e += 1
+        found(p, "trial", e)
+
+    own_pool = None
+    try:
+        stack = [m] if m > 1 else []
+        while stack:
+            x = stack.pop()
+            if is_prime(x):
+                found(x, "prime")
+                continue
+            if halted():
+                unfactored.append(x)
+                continue
+            power = _perfect_power(x)
+            if power is not None:
+                stack.extend([power[0]] * power[1])
+                continue
+            d, method = None, "rho"
+            for attempt in range(RHO_ATTEMPTS):
+                d = pollard_brent(x, seed=attempt, stop=halted)
+                if d or halted():
+                    break
+            if d is None:
+                method = "ecm"
+                if pool is None and workers > 1 and own_pool is None:
+                    own_pool = ProcessPoolExecutor(max_workers=workers)
+                for b1, curves in ECM_SCHEDULE:
+                    if halted() or (max_b1 is not None and b1 > max_b1):
+                        break
+                    d = ecm(x, b1, curves, workers=workers, pool=pool or own_pool, stop=halted)
+                    if d:
+                        break
+            if d is None:
+                unfactored.append(x)
+                continue
+            steps.append((method, min(d, x // d), time.perf_counter() - t0))
+            stack.extend((d, x // d))
+    finally:
+        if own_pool is not None:
+            own_pool.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.perf_counter() - t0
+    if metrics.ENABLED:
+        metrics.inc("factorizations_total")
+        metrics.observe("factorization_seconds", elapsed)
+    return {
+        "n": n,
+        "factors": sorted(factors),
+        "unfactored": sorted(unfactored),
+        "complete": not unfactored,
+        "seconds": elapsed,
+        "steps": steps,
+    }
+
+
+def format_factors(factors, unfactored=()):
+    """'2^3 × 5 × 7' (unfactored cofactors are shown in brackets)."""
+    parts = []
+    for p in sorted(set(factors)):
+        e = factors.count(p)
+        parts.append(f"{p}^{e}" if e > 1 else str(p))
+    parts.extend(f"[{c}]" for c in unfactored)
+    return " × ".join(parts) or "1"
+
+
+# ----- CLI -----
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Factor integers into primes.")
+    parser.add_argument("numbers", nargs="+", type=int)
+    parser.add_argument("--workers", type=int, default=1, help="processes for ECM curves (0: all cores)")
+    parser.add_argument("--time-limit", type=float, help="give up on a number after this many seconds")
+    args = parser.parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+    status = 0
+    for n in args.numbers:
+        if n < 1:
+            print(f"{n}: must be a positive integer", file=sys.stderr)
+            status = 1
+            continue
+        result = factorize(n, workers=workers, time_limit=args.time_limit)
+        note = "" if result["complete"] else " (incomplete)"
+        print(f"{n} = {format_factors(result['factors'], result['unfactored'])}"
+              f"  [{result['seconds']:.3f}s{note}]")
+        status |= not result["complete"]
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
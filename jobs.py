@@ -0,0 +1,257 @@
+"""Background jobs for the Streamlit app.
+
+A JobRunner owns a thread pool shared by every session of the server
+process (held with st.cache_resource), so long range scans, sieves,
+comparisons and factorizations run outside the script rerun.  Sessions keep only job ids.
+Tasks report progress and partial results through their Job and check
+`job.cancelled` between units of work, so a cancelled job stops at the
+next chunk and keeps what it found so far.
+"""
+
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark import summarize, time_call
+from factorization import factorize
+from prime_bitmap import build_bitmap
+from prime_store import default_store
+from range_scan import iter_parallel_scan
+
+# Jobs running at once per server; further jobs wait in the queue
+MAX_WORKERS = 2
+# Queued + running jobs accepted before submit() refuses new ones
+MAX_PENDING = 8
+# Finished jobs kept for their sessions to read back
+MAX_FINISHED = 64
+
+# Numbers per range-scan chunk (progress and cancellation granularity)
+SCAN_CHUNK = 1 << 20
+
+# A factor job gives up after this many seconds and climbs the ECM
+# schedule no higher than this B1 (stage-2 tables stay a few MB)
+FACTOR_TIME_LIMIT = 120.0
+FACTOR_MAX_B1 = 50_000
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+class Job:
+    """State of one background task, updated by the task and read by the UI."""
+
+    def __init__(self, job_id, name):
+        self.id = job_id
+        self.name = name
+        self.status = QUEUED
+        self.progress = 0.0
+        self.results = []  # partial results, appended by the task
+        self.value = None  # final value returned by the task
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    # ----- Task side -----
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def report(self, progress=None, results=()):
+        """Record progress (0-1) and append partial results."""
+        with self._lock:
+            if progress is not None:
+                self.progress = min(max(progress, 0.0), 1.0)
+            self.results.extend(results)
+
+    # ----- UI side -----
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def wait(self, timeout=None):
+        """Block until the job has ended; returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def snapshot(self, preview=None):
+        """Consistent copy of the job state for display (first `preview` results)."""
+        with self._lock:
+            return {
+                "id": self.id,
+                "name": self.name,
+                "status": self.status,
+                "progress": self.progress,
+                "count": len(self.results),
+                "results": self.results[:preview],
+                "value": self.value,
+                "error": self.error,
+                "elapsed_s": self.elapsed(),
+            }
+
+
+class JobRunner:
+    """Thread pool plus a registry of jobs by id."""
+
+    def __init__(self, max_workers=MAX_WORKERS, max_pending=MAX_PENDING):
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, name, task, *args):
+        """Queue task(job, *args) and return the new job id.
+
+        Raises RuntimeError when MAX_PENDING jobs are already queued or running.
+        """
+        with self._lock:
+            if sum(job.active for job in self._jobs.values()) >= self.max_pending:
+                raise RuntimeError("Too many jobs running — wait for one to finish or cancel it.")
+            job = Job(next(self._ids), name)
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job, task, args)
+        return job.id
+
+    def _run(self, job, task, args):
+        job.status = RUNNING
+        job.started = time.time()
+        try:
+            if not job.cancelled:
+                job.value = task(job, *args)
+            job.status = CANCELLED if job.cancelled else DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished = time.time()
+            job._done.set()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def active_count(self):
+        with self._lock:
+            return sum(job.active for job in self._jobs.values())
+
+
+# ----- Tasks -----
+def range_scan_task(job, start, end, pool=None):
+    """Scan [start, end] chunk by chunk, streaming primes found and storing them.
+
+    Chunks run on `pool` (a process pool) when given, otherwise in this thread.
+    """
+    first = max(start, 0)
+    total = max(end - first + 1, 1)
+    scan = iter_parallel_scan(start, end, workers=None if pool else 1, chunk_size=SCAN_CHUNK, pool=pool)
+    try:
+        for _, hi, found in scan:
+            default_store().add_many(found)
+            job.report((hi - first + 1) / total, found)
+            if job.cancelled:
+                break
+    finally:
+        scan.close()  # cancels chunks that have not started
+    return len(job.results)
+
+
+def sieve_task(job, sieve_cache, limit):
+    """Primes <= limit through the shared sieve cache."""
+    primes = sieve_cache.get(limit)
+    job.report(1.0)
+    return primes
+
+
+def bitmap_task(job, limit, path):
+    """Build the prime bitmap file up to limit; the prime count, or None if cancelled."""
+    return build_bitmap(limit, path, stop=lambda: job.cancelled, on_progress=job.report)
+
+
+def compare_task(job, n, repeats, backends):
+    """Time each (label, func, warmup) backend on n, one run at a time.
+
+    Returns {label: summary}; backends not finished before cancellation
+    are missing from the result.
+    """
+    stats = {}
+    steps = len(backends) * repeats
+    done = 0
+    for label, func, warmup in backends:
+        for _ in range(warmup):
+            func(n)
+        samples = []
+        for _ in range(repeats):
+            if job.cancelled:
+                return stats
+            samples += time_call(func, n, repeat=1, warmup=0)
+            done += 1
+            job.report(done / steps)
+        stats[label] = summarize(samples)
+    return stats
+
+
+def generate_task(job, generator, bits, count, pool=None):
+    """`count` primes from a prime_generation generator, streamed and stored as they are found.
+
+    Searches run on `pool` (a process pool) when given, otherwise in this
+    thread.  A cancelled job returns the primes found before it stopped.
+    """
+    made = 0
+
+    def on_prime(p):
+        nonlocal made
+        made += 1
+        default_store().add(p)
+        job.report(made / count, [p])
+
+    return generator(bits, count, workers=None if pool else 1, pool=pool,
+                     stop=lambda: job.cancelled, on_prime=on_prime)
+
+
+def factor_task(job, n, pool=None, time_limit=FACTOR_TIME_LIMIT, max_b1=FACTOR_MAX_B1):
+    """Factor n, streaming prime factors as they are found.
+
+    ECM curves run on `pool` (a process pool) when given; progress is the
+    share of n's bits already split off.  Returns the factorize() result,
+    with the remaining cofactor unfactored if the job was cancelled, ran
+    past `time_limit` seconds or exhausted the ECM levels up to `max_b1`.
+    """
+    bits = max(n.bit_length(), 1)
+    split = 1
+
+    def on_factor(p):
+        nonlocal split
+        split *= p
+        job.report(split.bit_length() / bits, [p])
+
+    workers = (os.cpu_count() or 1) if pool else 1
+    return factorize(n, workers=workers, pool=pool, time_limit=time_limit, stop=lambda: job.cancelled,
+                     on_factor=on_factor, max_b1=max_b1)
@@ -0,0 +1,176 @@
+"""Pool of ready-made RSA keypairs, refilled in the background.
+
+Key creation at cryptographic sizes is dominated by prime generation, so
+a KeypairPool keeps up to `size` keypairs of one configuration (prime
+size, number of primes, e) ready.  take() hands one out immediately and,
+once the pool drops below its low-water mark, queues enough refills to
+fill it again.  The primes come from a worker (a thread of the pool's own,
+or a shared process pool) and are already proven or BPSW-tested there, so
+the RSA object is built without re-testing them.
+
+    pool = KeypairPool(bits=1024, size=4)
+    rsa = pool.take(timeout=30)
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from prime_generation import generate_primes
+from rsa_simulation import RSA
+
+DEFAULT_SIZE = 4
+DEFAULT_LOW_WATER = 2
+
+# Completions remembered for the refill rate
+RATE_WINDOW = 16
+
+
+def make_key_primes(bits, count):
+    """Worker: `count` distinct primes of `bits` bits and the seconds it took."""
+    t0 = time.perf_counter()
+    primes = generate_primes(bits, count, workers=1)
+    return primes, time.perf_counter() - t0
+
+
+class KeypairPool:
+    """Up to `size` RSA keypairs of `bits`-bit primes, refilled below `low_water`.
+
+    Refills run on `executor` (e.g. a process pool shared with other work)
+    or, by default, on a private thread pool with `workers` threads.
+    """
+
+    def __init__(self, bits=1024, nprimes=2, e=65537, size=DEFAULT_SIZE,
+                 low_water=DEFAULT_LOW_WATER, workers=1, executor=None):
+        if not 0 <= low_water <= size or size < 1:
+            raise ValueError("Need 0 <= low_water <= size and size >= 1.")
+        self.bits = bits
+        self.nprimes = nprimes
+        self.e = e
+        self.size = size
+        self.low_water = low_water
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=workers, thread_name_prefix="keypair")
+        self._ready = deque()
+        self._in_flight = 0
+        self._futures = set()
+        self._made = 0
+        self._taken = 0
+        self._waits = 0
+        self._busy_s = 0.0
+        self._completed = deque(maxlen=RATE_WINDOW)
+        self._closed = False
+        self._cond = threading.Condition()
+        self.refill()
+
+    # ----- Refill -----
+    def refill(self):
+        """Queue enough work to bring ready + in-flight keypairs up to `size`."""
+        with self._cond:
+            if self._closed:
+                return
+            missing = self.size - len(self._ready) - self._in_flight
+            self._in_flight += max(missing, 0)
+        for _ in range(missing):
+            try:
+                future = self._executor.submit(make_key_primes, self.bits, self.nprimes)
+            except RuntimeError:  # executor shut down
+                with self._cond:
+                    self._in_flight -= 1
+                continue
+            with self._cond:
+                self._futures.add(future)
+            future.add_done_callback(self._on_primes)
+
+    def _on_primes(self, future):
+        with self._cond:
+            self._futures.discard(future)
+        try:
+            primes, seconds = future.result()
+        except Exception:
+            # cancelled, executor shut down or the worker failed: give the slot back
+            with self._cond:
+                self._in_flight -= 1
+            return
+        try:
+            rsa = RSA(primes[0], primes[1], self.e, extra_primes=tuple(primes[2:]), validate=False)
+        except ValueError:
+            rsa = None  # e not coprime to phi(n): draw new primes
+        with self._cond:
+            self._in_flight -= 1
+            if rsa is not None:
+                self._ready.append(rsa)
+                self._made += 1
+                self._busy_s += seconds
+                self._completed.append(time.time())
+                self._cond.notify()
+        if metrics.ENABLED and rsa is not None:
+            metrics.inc("keypairs_generated_total")
+        if rsa is None:
+            self.refill()
+
+    # ----- Consumers -----
+    def take(self, timeout=None):
+        """A ready keypair, waiting up to `timeout` seconds (None: forever) if the pool is empty.
+
+        Returns None on timeout.  Refills start once fewer than `low_water`
+        keypairs are left.
+        """
+        if self.depth == 0:
+            self.refill()  # nothing ready (e.g. low_water == 0): make sure some is coming
+        with self._cond:
+            waited = not self._ready
+            if waited:
+                self._waits += 1
+            ready = self._cond.wait_for(lambda: self._ready or self._closed, timeout)
+            rsa = self._ready.popleft() if ready and self._ready else None
+            if rsa is not None:
+                self._taken += 1
+            low = len(self._ready) < self.low_water
+        if metrics.ENABLED:
+            metrics.inc("keypair_pool_takes_total")
+            if waited:
+                metrics.inc("keypair_pool_empty_total")
+        if low:
+            self.refill()
+        return rsa
+
+    @property
+    def depth(self):
+        with self._cond:
+            return len(self._ready)
+
+    def stats(self):
+        """Depth, refills in flight, totals, refill rate (keypairs/s) and mean seconds per keypair."""
+        with self._cond:
+            done = list(self._completed)
+            span = done[-1] - done[0] if len(done) > 1 else 0.0
+            return {
+                "bits": self.bits,
+                "nprimes": self.nprimes,
+                "depth": len(self._ready),
+                "size": self.size,
+                "in_flight": self._in_flight,
+                "made": self._made,
+                "taken": self._taken,
+                "waits": self._waits,
+                "refill_rate": (len(done) - 1) / span if span else 0.0,
+                "mean_make_s": self._busy_s / self._made if self._made else 0.0,
+            }
+
+    def close(self):
+        """Stop refilling and wake waiting consumers; keypairs already made stay available.
+
+        Refills that have not started are cancelled, so a shared executor
+        is not left working for a pool nobody uses.
+        """
+        with self._cond:
+            self._closed = True
+            queued = list(self._futures)
+            self._cond.notify_all()
+        for future in queued:
+            future.cancel()
+        if self._own_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
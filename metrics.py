@@ -0,0 +1,129 @@
+"""Opt-in counters and timing histograms for the hot paths.
+
+Instrumented code guards every update with `if metrics.ENABLED:`, so the
+cost when disabled is one global lookup per call.  Enable with
+PRIME_METRICS=1 in the environment or metrics.enable().  Metrics are
+per process: work done inside process-pool workers is not counted.
+
+    metrics.enable()
+    ...
+    metrics.write("metrics.prom")   # Prometheus text format
+    metrics.write("metrics.json")   # JSON snapshot
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+ENABLED = os.environ.get("PRIME_METRICS", "") not in ("", "0")
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 0.1, 1.0, 10.0)
+
+DESCRIPTIONS = {
+    "sieve_segments_total": "Sieve segments/windows struck",
+    "sieve_segment_seconds": "Time to strike one sieve segment",
+    "trial_division_candidates_total": "Candidates checked by batch trial division",
+    "trial_division_factor_found_total": "Candidates with a small prime factor",
+    "trial_division_batch_seconds": "Time per batch trial division call",
+    "primality_tests_total": "is_prime calls",
+    "primality_bitmap_lookups_total": "is_prime calls answered by the prime bitmap",
+    "primality_small_prime_rejects_total": "is_prime calls rejected by a small prime",
+    "primality_test_seconds": "Time per is_prime call that reached Miller-Rabin",
+    "miller_rabin_rounds_total": "Scalar strong probable-prime rounds",
+    "miller_rabin_batch_lanes_total": "Candidates tested by vectorized Miller-Rabin",
+    "lucas_tests_total": "Strong Lucas tests",
+    "modexp_total": "Modular exponentiations (Miller-Rabin and RSA)",
+    "factorizations_total": "factorize calls",
+    "factorization_seconds": "Time per factorize call",
+    "ecm_curves_total": "ECM curves run (pooled curves counted when they finish)",
+    "keypairs_generated_total": "RSA keypairs made by keypair pools",
+    "keypair_pool_takes_total": "Keypairs requested from keypair pools",
+    "keypair_pool_empty_total": "Keypair requests that found the pool empty",
+    "rsa_bytes_encrypted_total": "Plaintext bytes encrypted",
+    "rsa_bytes_decrypted_total": "Plaintext bytes recovered by decryption",
+    "rsa_encrypt_seconds": "Time per RSA encrypt_bytes call",
+    "rsa_decrypt_seconds": "Time per RSA decrypt_bytes call",
+}
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}  # name -> [bucket counts..., +Inf count, sum]
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+# ----- Updates (call only under `if metrics.ENABLED:`) -----
+def inc(name, value=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name, seconds):
+    with _lock:
+        h = _histograms.get(name)
+        if h is None:
+            h = _histograms[name] = [0] * (len(BUCKETS) + 1) + [0.0]
+        h[bisect_left(BUCKETS, seconds)] += 1
+        h[-1] += seconds
+
+
+def now():
+    return time.perf_counter()
+
+
+# ----- Export -----
+def snapshot():
+    """{'counters': {name: value}, 'histograms': {name: {...}}} (cumulative buckets)."""
+    with _lock:
+        counters = dict(sorted(_counters.items()))
+        histograms = {}
+        for name, h in sorted(_histograms.items()):
+            cumulative, running = {}, 0
+            for bound, count in zip(BUCKETS + (float("inf"),), h[:-1]):
+                running += count
+                cumulative["+Inf" if bound == float("inf") else repr(bound)] = running
+            histograms[name] = {"buckets": cumulative, "count": running, "sum": h[-1]}
+    return {"enabled": ENABLED, "counters": counters, "histograms": histograms}
+
+
+def to_json(snap=None):
+    return json.dumps(snap or snapshot(), indent=2)
+
+
+def to_prometheus(snap=None):
+    """Prometheus text exposition format."""
+    snap = snap or snapshot()
+    lines = []
+    for name, value in snap["counters"].items():
+        if name in DESCRIPTIONS:
+            lines.append(f"# HELP {name} {DESCRIPTIONS[name]}")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {value}")
+    for name, h in snap["histograms"].items():
+        if name in DESCRIPTIONS:
+            lines.append(f"# HELP {name} {DESCRIPTIONS[name]}")
+        lines.append(f"# TYPE {name} histogram")
+        for bound, count in h["buckets"].items():
+            lines.append(f'{name}_bucket{{le="{bound}"}} {count}')
+        lines.append(f"{name}_sum {h['sum']}")
+        lines.append(f"{name}_count {h['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def write(path):
+    """Write a snapshot: JSON for *.json paths, Prometheus text otherwise."""
+    text = to_json() if path.endswith(".json") else to_prometheus()
+    with open(path, "w") as f:
+        f.write(text)
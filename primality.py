@@ -0,0 +1,265 @@
+"""Deterministic fast primality testing.
+
+For n < 2**64 a strong-probable-prime test over a minimal known base set
+is a proof of primality.  Above that, Baillie-PSW (a strong base-2 test
+followed by a strong Lucas test) is used: it has no known counterexample
+and costs about three modular exponentiations.
+"""
+
+import secrets
+
+import metrics
+from bigint_backend import isqrt, powmod
+
+SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47)
+
+# (upper bound, bases): strong tests over `bases` are exact for n < bound
+DETERMINISTIC_BASES = (
+    (2047, (2,)),
+    (1_373_653, (2, 3)),
+    (9_080_191, (31, 73)),
+    (4_759_123_141, (2, 7, 61)),
+    (1_122_004_669_633, (2, 13, 23, 1_662_803)),
+    (2_152_302_898_747, (2, 3, 5, 7, 11)),
+    (3_474_749_660_383, (2, 3, 5, 7, 11, 13)),
+    (341_550_071_728_321, (2, 3, 5, 7, 11, 13, 17)),
+    (1 << 64, (2, 325, 9375, 28178, 450775, 9780504, 1795265022)),
+)
+
+# Batch tests run vectorized below this bound: residues < 2**32 keep every
+# product inside uint64, and bases (2, 7, 61) are exact up to 4_759_123_141
+BATCH_LIMIT = 1 << 32
+BATCH_BASES = (2, 7, 61)
+
+# Modes reported by primality_mode()
+TRIVIAL = "trivial"
+BITMAP = "bitmap"
+DETERMINISTIC = "deterministic"
+BPSW = "bpsw"
+
+# Optional PrimeBitmap (see prime_bitmap.py) answering n <= its limit
+_bitmap = None
+
+
+# ----- Building blocks -----
+def deterministic_bases(n):
+    """Smallest known base set that makes Miller-Rabin exact for n, or None."""
+    for bound, bases in DETERMINISTIC_BASES:
+        if n < bound:
+            return bases
+    return None
+
+
+def strong_probable_prime(n, a):
+    """Strong (Miller-Rabin) test of odd n > 2 to base a."""
+    if metrics.ENABLED:
+        metrics.inc("miller_rabin_rounds_total")
+        metrics.inc("modexp_total")
+    a %= n
+    if a == 0:
+        return True
+    d = n - 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+    x = powmod(a, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def jacobi(a, n):
+    """Jacobi symbol (a/n) for odd n > 0."""
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def strong_lucas_probable_prime(n):
+    """Strong Lucas test of odd n > 2 with Selfridge's parameters (P = 1)."""
+    if metrics.ENABLED:
+        metrics.inc("lucas_tests_total")
+    if isqrt(n) ** 2 == n:
+        return False
+    D = 5
+    while True:
+        j = jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    Q = (1 - D) // 4
+
+    d = n + 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+
+    # U_k, V_k, Q^k by left-to-right binary expansion of d, starting at k=1
+    U, V, Qk = 1, 1, Q % n
+    for bit in bin(d)[3:]:
+        U = U * V % n
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if bit == "1":
+            U, V = (U + V) % n, (D * U + V) % n
+            if U & 1:
+                U += n
+            U = (U >> 1) % n
+            if V & 1:
+                V += n
+            V = (V >> 1) % n
+            Qk = Qk * Q % n
+
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        if V == 0:
+            return True
+        Qk = Qk * Qk % n
+    return False
+
+
+# ----- Engine -----
+def use_bitmap(bitmap):
+    """Answer is_prime(n) for n <= bitmap.limit from a PrimeBitmap (None disables)."""
+    global _bitmap
+    _bitmap = bitmap
+
+
+def primality_mode(n):
+    """Name of the test is_prime(n) uses: 'trivial', 'bitmap', 'deterministic' or 'bpsw'.
+
+    Only 'bpsw' answers are probable primes (with no known counterexample);
+    the others are proofs.
+    """
+    if n < SMALL_PRIMES[-1] ** 2:
+        return TRIVIAL
+    if _bitmap is not None and n <= _bitmap.limit:
+        return BITMAP
+    return DETERMINISTIC if deterministic_bases(n) else BPSW
+
+
+def is_prime(n, extra_rounds=0):
+    """Primality test: exact below 2**64, Baillie-PSW above.
+
+    `extra_rounds` adds that many random-base Miller-Rabin rounds on top
+    of Baillie-PSW for n >= 2**64.
+    """
+    if metrics.ENABLED:
+        metrics.inc("primality_tests_total")
+    if n < 2:
+        return False
+    if _bitmap is not None and n <= _bitmap.limit:
+        if metrics.ENABLED:
+            metrics.inc("primality_bitmap_lookups_total")
+        return _bitmap.is_prime(n)
+    for p in SMALL_PRIMES:
+        if n % p == 0:
+            if metrics.ENABLED and n != p:
+                metrics.inc("primality_small_prime_rejects_total")
+            return n == p
+    if n < SMALL_PRIMES[-1] ** 2:
+        return True
+
+    if metrics.ENABLED:
+        t0 = metrics.now()
+        result = _probable_prime(n, extra_rounds)
+        metrics.observe("primality_test_seconds", metrics.now() - t0)
+        return result
+    return _probable_prime(n, extra_rounds)
+
+
+def _probable_prime(n, extra_rounds):
+    """Miller-Rabin / Baillie-PSW stage of is_prime (n odd, no factor <= 47)."""
+    bases = deterministic_bases(n)
+    if bases:
+        return all(strong_probable_prime(n, a) for a in bases)
+
+    if not (strong_probable_prime(n, 2) and strong_lucas_probable_prime(n)):
+        return False
+    for _ in range(extra_rounds):
+        if not strong_probable_prime(n, secrets.randbelow(n - 3) + 2):
+            return False
+    return True
+
+
+# ----- Batch engine -----
+def _strong_probable_prime_batch(n, a):
+    """Vectorized strong test of odd uint64 n (3 < n < 2**32) to base a."""
+    import numpy as np
+
+    one = np.uint64(1)
+    d = n - one
+    s = np.zeros(n.shape, dtype=np.uint64)
+    even = (d & one) == 0
+    while even.any():
+        d = np.where(even, d >> one, d)
+        s += even
+        even = (d & one) == 0
+
+    # x = a**d mod n by right-to-left square-and-multiply over all lanes
+    x = np.ones(n.shape, dtype=np.uint64)
+    base = np.uint64(a) % n
+    e = d
+    while e.any():
+        x = np.where(e & one, x * base % n, x)
+        base = base * base % n
+        e = e >> one
+
+    ok = (x == one) | (x == n - one)
+    for r in range(1, int(s.max(initial=1))):
+        x = x * x % n
+        ok |= (x == n - one) & (s > np.uint64(r))
+    return ok
+
+
+def is_probable_prime_batch(values):
+    """Boolean mask of which entries of an integer array are prime.
+
+    Entries below 2**32 are tested together with array-wide Miller-Rabin
+    over the deterministic bases (2, 7, 61), so the answer is exact; any
+    larger entries fall back to is_prime one by one.
+    """
+    import numpy as np  # only batch callers pay for NumPy
+
+    n = np.asarray(values, dtype=np.uint64)
+    result = np.zeros(n.shape, dtype=bool)
+    if n.size == 0:
+        return result
+    big = n >= np.uint64(BATCH_LIMIT)
+
+    candidates = (n >= 2) & ~big
+    for p in SMALL_PRIMES:
+        divisible = candidates & (n % np.uint64(p) == 0)
+        result |= divisible & (n == p)
+        candidates &= ~divisible
+    result |= candidates & (n < SMALL_PRIMES[-1] ** 2)
+    candidates &= n >= SMALL_PRIMES[-1] ** 2
+
+    idx = np.flatnonzero(candidates)
+    if metrics.ENABLED:
+        metrics.inc("miller_rabin_batch_lanes_total", int(idx.size))
+    if idx.size:
+        m = n.ravel()[idx]
+        ok = np.ones(idx.size, dtype=bool)
+        for a in BATCH_BASES:
+            ok[ok] = _strong_probable_prime_batch(m[ok], a)
+        result.ravel()[idx] = ok
+
+    for i in np.flatnonzero(big).tolist():
+        result.ravel()[i] = is_prime(int(n.ravel()[i]))
+    return result
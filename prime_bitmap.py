@@ -0,0 +1,195 @@
+"""Memory-mapped odd-only prime bitmap with a rank directory.
+
+File layout (little-endian):
+
+    header      magic b"PBMP", version, limit, payload bytes, block bytes
+    bitmap      bit j (LSB first within each byte) set iff 2*j + 1 is prime,
+                zero-padded to a whole number of blocks
+    directory   uint64 per block: odd primes in all earlier blocks, plus a
+                final entry with the total
+
+Membership is one bit read, pi(x) is one directory read plus a popcount
+inside a single block, and the k-th prime is a binary search over the
+directory followed by a scan of one block.
+
+Usage:
+    python prime_bitmap.py build LIMIT [--path primes.bitmap]
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+from segmented_sieve import iter_packed_segments
+
+DEFAULT_PATH = os.environ.get("PRIME_BITMAP_PATH", "primes.bitmap")
+
+MAGIC = b"PBMP"
+VERSION = 1
+HEADER = struct.Struct("<4sIQQQ")  # magic, version, limit, bitmap bytes, block bytes
+BLOCK_BYTES = 256
+
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+# ----- Build -----
+def build_bitmap(limit, path=DEFAULT_PATH, stop=None, on_progress=None):
+    """Sieve up to limit and write the bitmap file; returns the prime count.
+
+    `stop` is polled between sieve segments; returning True abandons the
+    build (the existing file is left alone) and returns None.
+    `on_progress(fraction)` is called after each segment.
+    """
+    if limit < 2:
+        raise ValueError("limit must be >= 2.")
+    block_counts = []
+    carry = b""
+    written = 0
+    stopped = False
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, limit, 0, BLOCK_BYTES))
+        for chunk in iter_packed_segments(limit):
+            if stop is not None and stop():
+                stopped = True
+                break
+            if on_progress is not None:
+                on_progress(min(16 * (written + len(carry) + len(chunk)) / limit, 1.0))
+            data = carry + chunk
+            whole = len(data) - len(data) % BLOCK_BYTES
+            if whole:
+                blocks = np.frombuffer(data, dtype=np.uint8, count=whole).reshape(-1, BLOCK_BYTES)
+                block_counts.append(POPCOUNT[blocks].sum(axis=1, dtype=np.uint64))
+                f.write(data[:whole])
+                written += whole
+            carry = data[whole:]
+        if stopped:
+            f.close()
+            os.remove(tmp)
+            return None
+        if carry:
+            padded = carry + b"\x00" * (BLOCK_BYTES - len(carry))
+            block_counts.append(POPCOUNT[np.frombuffer(padded, dtype=np.uint8)].sum(dtype=np.uint64).reshape(1))
+            f.write(padded)
+            written += len(padded)
+
+        counts = np.concatenate(block_counts) if block_counts else np.zeros(0, dtype=np.uint64)
+        directory = np.zeros(counts.size + 1, dtype="<u8")
+        np.cumsum(counts, out=directory[1:])
+        f.write(directory.tobytes())
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, limit, written, BLOCK_BYTES))
+    os.replace(tmp, path)
+    return int(directory[-1]) + 1  # + the even prime 2
+
+
+# ----- Queries -----
+class PrimeBitmap:
+    """Read-only view of a bitmap file built by build_bitmap."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.limit, nbytes, self.block_bytes = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a prime bitmap file.")
+        self._bits = np.frombuffer(self._mm, dtype=np.uint8, count=nbytes, offset=HEADER.size)
+        nblocks = nbytes // self.block_bytes
+        self._directory = np.frombuffer(self._mm, dtype="<u8", count=nblocks + 1, offset=HEADER.size + nbytes)
+        self.block_bits = 8 * self.block_bytes
+
+    def _check(self, n):
+        if n > self.limit:
+            raise ValueError(f"{n} is beyond the bitmap limit {self.limit}.")
+
+    def is_prime(self, n):
+        """O(1) membership test for n <= limit."""
+        self._check(n)
+        if n < 3:
+            return n == 2
+        if n % 2 == 0:
+            return False
+        j = n >> 1
+        return bool((self._bits[j >> 3] >> (j & 7)) & 1)
+
+    def _rank(self, j):
+        """Number of set bits among bits [0, j)."""
+        block, offset = divmod(j, self.block_bits)
+        count = int(self._directory[min(block, self._directory.size - 1)])
+        if offset:
+            start = block * self.block_bytes
+            full, rest = divmod(offset, 8)
+            count += int(POPCOUNT[self._bits[start:start + full]].sum())
+            if rest:
+                count += int(POPCOUNT[self._bits[start + full] & ((1 << rest) - 1)])
+        return count
+
+    def pi(self, x):
+        """Number of primes <= x (x <= limit)."""
+        if x < 2:
+            return 0
+        self._check(x)
+        # odd numbers 1, 3, ..., <= x are bits [0, (x - 1) // 2]
+        return 1 + self._rank((x - 1) // 2 + 1)
+
+    def count(self):
+        """Number of primes <= limit."""
+        return 1 + int(self._directory[-1])
+
+    def nth_prime(self, k):
+        """The k-th prime (1-based), if it is <= limit."""
+        if k < 1 or k > self.count():
+            raise ValueError(f"k must be between 1 and {self.count()}.")
+        if k == 1:
+            return 2
+        target = k - 1  # rank among odd primes
+        block = int(np.searchsorted(self._directory, np.uint64(target), side="left")) - 1
+        start = block * self.block_bytes
+        bits = np.unpackbits(self._bits[start:start + self.block_bytes], bitorder="little")
+        idx = int(np.searchsorted(np.cumsum(bits), target - int(self._directory[block]), side="left"))
+        return 2 * (block * self.block_bits + idx) + 1
+
+    def close(self):
+        self._bits = self._directory = None
+        self._mm.close()
+
+
+# ----- CLI -----
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query a prime bitmap file.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="sieve up to LIMIT and write the bitmap")
+    build.add_argument("limit", type=int)
+    build.add_argument("--path", default=DEFAULT_PATH)
+    query = sub.add_parser("pi", help="count primes <= X")
+    query.add_argument("x", type=int)
+    query.add_argument("--path", default=DEFAULT_PATH)
+    nth = sub.add_parser("nth", help="the K-th prime")
+    nth.add_argument("k", type=int)
+    nth.add_argument("--path", default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "build":
+            t0 = time.perf_counter()
+            total = build_bitmap(args.limit, args.path)
+            print(f"{total} primes <= {args.limit} written to {args.path} "
+                  f"({os.path.getsize(args.path) / 1e6:.1f} MB) in {time.perf_counter() - t0:.2f}s")
+        elif args.command == "pi":
+            print(PrimeBitmap(args.path).pi(args.x))
+        else:
+            print(PrimeBitmap(args.path).nth_prime(args.k))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
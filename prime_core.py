@@ -0,0 +1,30 @@
+"""Prime helpers shared by the CLI modules, the RSA simulation and the app.
+
+Importing this module is cheap: NumPy (via the segmented sieve and
+PrimeSequence) is only loaded the first time sieve() runs.
+"""
+
+from primality import BPSW, is_prime, primality_mode
+
+
+def sieve(limit):
+    """All primes <= limit as a compact PrimeSequence (segmented sieve)."""
+    from prime_sequence import PrimeSequence
+    from segmented_sieve import primes_up_to
+
+    return PrimeSequence(primes_up_to(limit))
+
+
+def is_probable_prime(n, k=0):
+    """Exact for n < 2**64, Baillie-PSW above (plus k random MR rounds)."""
+    return is_prime(n, extra_rounds=k)
+
+
+def prime_label(n):
+    """'Prime' when the test is a proof for n, 'Probably Prime' in the BPSW range."""
+    return "Probably Prime" if primality_mode(n) == BPSW else "Prime"
+
+
+def primes_label(largest):
+    """'primes', or 'probable primes' when the largest of them is in the BPSW range."""
+    return "probable primes" if largest is not None and primality_mode(largest) == BPSW else "primes"
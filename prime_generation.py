@@ -0,0 +1,232 @@
+"""Random prime generation for cryptographic sizes.
+
+Each search draws a random odd start with the top two bits set (so the
+product of two such primes has exactly twice as many bits), sieves a
+window of candidates after it against the base primes, and runs the
+primality engine only on the survivors.  Windows are independent, so
+they are fanned out over a process pool.
+
+Safe primes p = 2q + 1 sieve q and 2q + 1 in the same window mask, so a
+candidate survives only if neither side has a small factor; strong
+primes follow Gordon's algorithm over sieved arithmetic progressions.
+"""
+
+import os
+import secrets
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from bigint_backend import invert
+from primality import is_prime, strong_probable_prime
+from segmented_sieve import base_primes, iter_window_survivors, progression_survivors
+
+# Base primes used to pre-sieve candidate windows
+SIEVE_LIMIT = 1 << 16
+
+# Smallest supported size; below this a window covers most of the range
+MIN_BITS = 16
+
+# Odd candidates per window; several primes are expected per window
+# even at 4096 bits
+WINDOW_SIZE = 1 << 13
+
+# Safe primes: deeper base primes (both q and 2q + 1 are struck) and
+# wider windows, since only ~1 in ln(p) primes q gives a prime 2q + 1
+SAFE_SIEVE_LIMIT = 1 << 20
+SAFE_WINDOW_SIZE = 1 << 16
+
+# Strong primes: s and t have bits/2 - STRONG_MARGIN bits, which leaves
+# room for the multipliers that place r and p
+STRONG_MARGIN = 16
+STRONG_MIN_BITS = 2 * (MIN_BITS + STRONG_MARGIN)
+
+# q = (p - 1) / 2 is drawn with random_start, so it needs MIN_BITS bits
+SAFE_MIN_BITS = MIN_BITS + 1
+
+# Seconds between stop checks while waiting on pooled searches
+STOP_POLL = 0.2
+
+_base = None
+_safe_base = None
+
+
+def _base_primes():
+    global _base
+    if _base is None:
+        _base = base_primes(SIEVE_LIMIT)
+    return _base
+
+
+def _safe_base_primes():
+    global _safe_base
+    if _safe_base is None:
+        _safe_base = base_primes(SAFE_SIEVE_LIMIT)
+    return _safe_base
+
+
+# ----- Single window -----
+def random_start(bits):
+    """Random odd integer with exactly `bits` bits and the top two bits set."""
+    if bits < MIN_BITS:
+        raise ValueError(f"bits must be >= {MIN_BITS}.")
+    return secrets.randbits(bits) | (3 << (bits - 2)) | 1
+
+
+def search_window(bits, start=None):
+    """First prime of `bits` bits in the sieved window at `start`, or None."""
+    if start is None:
+        start = random_start(bits)
+    end = min(start + 2 * WINDOW_SIZE, (1 << bits) - 1)
+    for lo, mask in iter_window_survivors(start, end, _base_primes()):
+        for i in np.flatnonzero(mask).tolist():
+            if is_prime(lo + 2 * i):
+                return lo + 2 * i
+    return None
+
+
+def search_safe_window(bits, start=None):
+    """First safe prime p = 2q + 1 of `bits` bits with q in the window at `start`, or None.
+
+    q and 2q + 1 are struck in one mask.  Survivors get a single base-2
+    round on q (the cheaper side) and then on p; only candidates passing
+    both reach the full primality engine.
+    """
+    if start is None:
+        start = random_start(bits - 1)
+    count = min(SAFE_WINDOW_SIZE, ((1 << (bits - 1)) - 1 - start) // 2 + 1)
+    if count < 1:
+        return None
+    mask = progression_survivors(start, 2, count, _safe_base_primes())
+    progression_survivors(2 * start + 1, 4, count, _safe_base_primes(), mask)
+    for i in np.flatnonzero(mask).tolist():
+        q = start + 2 * i
+        p = 2 * q + 1
+        if strong_probable_prime(q, 2) and strong_probable_prime(p, 2) and is_prime(q) and is_prime(p):
+            return p
+    return None
+
+
+def _first_in_progression(a, step, count=WINDOW_SIZE):
+    """First prime among a, a + step, ..., a + (count-1)*step, or None."""
+    mask = progression_survivors(a, step, count, _base_primes())
+    for k in np.flatnonzero(mask).tolist():
+        if is_prime(a + k * step):
+            return a + k * step
+    return None
+
+
+def search_strong(bits):
+    """One run of Gordon's algorithm: a strong prime of `bits` bits, or None.
+
+    p - 1 has the large prime factor r, p + 1 has s, and r - 1 has t.
+    """
+    half = bits // 2 - STRONG_MARGIN
+    s, t = search_window(half), search_window(half)
+    if s is None or t is None or s == t:
+        return None
+    # r = 2*i*t + 1, about STRONG_MARGIN / 2 bits longer than t
+    r = _first_in_progression(2 * t * (1 << (STRONG_MARGIN // 2)) + 1, 2 * t)
+    if r is None:
+        return None
+    # p0 = 1 (mod r) and -1 (mod s); p = p0 + 2*j*r*s from the top quarter
+    step = 2 * r * s
+    p0 = 2 * invert(s, r) * s - 1
+    lowest = 3 << (bits - 2)
+    a = p0 + -(-(lowest - p0) // step) * step
+    p = _first_in_progression(a, step, min(WINDOW_SIZE, ((1 << bits) - 1 - a) // step + 1))
+    return p
+
+
+# ----- Public API -----
+def _collect(search, bits, count, workers, pool=None, stop=None, on_prime=None):
+    """`count` distinct results of search(bits), which may return None.
+
+    Searches run in this process, or on `workers` processes (or an
+    existing `pool`, which is left running).  `stop` is polled between
+    searches; returning True ends early with the primes found so far.
+    `on_prime(p)` is called for each prime as it is found.
+    """
+    if count < 1:
+        return []
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    found = []
+
+    def keep(p):
+        if p is None or p in found or len(found) >= count:
+            return
+        found.append(p)
+        if on_prime is not None:
+            on_prime(p)
+
+    if pool is None and workers <= 1:
+        while len(found) < count:
+            if stop is not None and stop():
+                break
+            keep(search(bits))
+        return found
+
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    pending = set()
+    try:
+        pending = {pool.submit(search, bits) for _ in range(workers)}
+        while len(found) < count:
+            done, pending = wait(pending, timeout=STOP_POLL, return_when=FIRST_COMPLETED)
+            for future in done:
+                keep(future.result())
+                if len(found) < count:
+                    pending.add(pool.submit(search, bits))
+            if stop is not None and stop():
+                break
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+    return found
+
+
+def generate_primes(bits, count, workers=None, pool=None, stop=None, on_prime=None):
+    """Return `count` distinct random primes of exactly `bits` bits.
+
+    Windows are searched on `workers` processes (default: all cores) or
+    on an existing `pool`; with one worker everything runs in the calling
+    process.  `stop` and `on_prime` are as for _collect: a stopped search
+    returns fewer than `count` primes.
+    """
+    if bits < MIN_BITS:
+        raise ValueError(f"bits must be >= {MIN_BITS}.")
+    return _collect(search_window, bits, count, workers, pool, stop, on_prime)
+
+
+def generate_prime(bits, workers=None):
+    """Return one random prime of exactly `bits` bits."""
+    return generate_primes(bits, 1, workers)[0]
+
+
+def generate_safe_primes(bits, count, workers=None, pool=None, stop=None, on_prime=None):
+    """Return `count` distinct random safe primes (p = 2q + 1, q prime) of `bits` bits."""
+    if bits < SAFE_MIN_BITS:
+        raise ValueError(f"bits must be >= {SAFE_MIN_BITS}.")
+    return _collect(search_safe_window, bits, count, workers, pool, stop, on_prime)
+
+
+def generate_safe_prime(bits, workers=None):
+    """Return one random safe prime of exactly `bits` bits."""
+    return generate_safe_primes(bits, 1, workers)[0]
+
+
+def generate_strong_primes(bits, count, workers=None, pool=None, stop=None, on_prime=None):
+    """Return `count` distinct random strong primes (Gordon) of `bits` bits."""
+    if bits < STRONG_MIN_BITS:
+        raise ValueError(f"bits must be >= {STRONG_MIN_BITS}.")
+    return _collect(search_strong, bits, count, workers, pool, stop, on_prime)
+
+
+def generate_strong_prime(bits, workers=None):
+    """Return one random strong prime of exactly `bits` bits."""
+    return generate_strong_primes(bits, 1, workers)[0]
@@ -0,0 +1,115 @@
+"""Compact, immutable, sorted sequence of primes.
+
+Primes below 2**64 are held in one uint64 NumPy array (8 bytes each,
+against ~36 for a list of Python ints); sequences with larger values fall
+back to an object array with the same interface.  Slicing returns a view
+without copying, membership and index() are binary searches, and window()
+hands widgets a short list without materializing the whole sequence.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+_U64_LIMIT = 1 << 64
+_ITER_CHUNK = 4096
+
+
+class PrimeSequence(Sequence):
+    """Read-only sorted primes with O(1) indexing and O(log n) lookups.
+
+    The values must already be sorted in increasing order (sieve output,
+    store ranges); this is not re-checked.
+    """
+
+    __slots__ = ("_a",)
+
+    def __init__(self, values=()):
+        if isinstance(values, PrimeSequence):
+            a = values._a
+        elif isinstance(values, np.ndarray) and values.dtype == np.uint64:
+            a = values.view()
+        else:
+            values = values if isinstance(values, (list, tuple, np.ndarray)) else list(values)
+            try:
+                a = np.asarray(values, dtype=np.uint64)
+            except OverflowError:
+                a = np.array([int(v) for v in values], dtype=object)
+        a.flags.writeable = False
+        self._a = a
+
+    # ----- Sequence protocol -----
+    def __len__(self):
+        return self._a.shape[0]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return PrimeSequence(self._a[i])
+        return int(self._a[i])
+
+    def __iter__(self):
+        for start in range(0, len(self), _ITER_CHUNK):
+            yield from self._a[start:start + _ITER_CHUNK].tolist()
+
+    def _search(self, x):
+        """Position of int x in the array, or -1."""
+        if not isinstance(x, (int, np.integer)) or x < 0:
+            return -1
+        x = int(x)
+        if self._a.dtype == np.uint64:
+            if x >= _U64_LIMIT:
+                return -1
+            x = np.uint64(x)
+        i = int(np.searchsorted(self._a, x))
+        return i if i < len(self) and self._a[i] == x else -1
+
+    def __contains__(self, x):
+        return self._search(x) >= 0
+
+    def index(self, x, start=0, stop=None):
+        i = self._search(x)
+        if i < 0 or i < start or (stop is not None and i >= stop):
+            raise ValueError(f"{x} is not in the sequence")
+        return i
+
+    def count(self, x):
+        return 1 if x in self else 0
+
+    def __eq__(self, other):
+        """Element-wise equality with any sequence of ints, so sieve(10) == [2, 3, 5, 7] as for a list."""
+        if isinstance(other, PrimeSequence):
+            return len(self) == len(other) and bool(np.all(self._a == other._a))
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # mutable-looking equality, like list
+
+    def __repr__(self):
+        if len(self) == 0:
+            return "PrimeSequence([])"
+        return f"PrimeSequence(len={len(self)}, first={self[0]}, last={self[-1]})"
+
+    # ----- Extras -----
+    def window(self, start=0, size=200):
+        """Plain list of at most `size` values from `start` (negative counts from the end)."""
+        if start < 0:
+            start = max(len(self) + start, 0)
+        return self._a[start:start + size].tolist()
+
+    def without(self, x):
+        """New sequence with x removed (a copy only when x is present)."""
+        i = self._search(x)
+        return self if i < 0 else PrimeSequence(np.delete(self._a, i))
+
+    def tolist(self):
+        return self._a.tolist()
+
+    @property
+    def array(self):
+        """The backing (read-only) NumPy array."""
+        return self._a
+
+    @property
+    def nbytes(self):
+        return self._a.nbytes
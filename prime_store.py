@@ -0,0 +1,286 @@
+"""Persistent on-disk prime store.
+
+A store is a directory holding:
+
+    base.u64    sorted primes below 2**64 as little-endian uint64 (mmapped)
+    base.idx    open-addressing hash table over base.u64 (uint64, 0 = empty,
+                linear probing, load factor <= 1/2), mmapped for O(1) lookups
+    big.bin     sorted primes >= 2**64, length-prefixed big-endian records
+    append.log  primes added since the last merge, same record format
+    lock        flock()ed around log appends and merges (cross-process)
+
+New primes are appended to the log (one write per batch) and kept in an
+in-memory set; once the log holds `merge_threshold` entries it is merged
+into the base files, which are rewritten atomically.  The store is shared
+by the CLI and the Streamlit app, so found primes survive restarts; a
+merge re-reads the files under the lock, so entries appended by another
+process are never dropped.
+"""
+
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from bisect import bisect_left, bisect_right
+from heapq import merge as merge_sorted
+
+import numpy as np
+
+from prime_sequence import PrimeSequence
+
+try:
+    import fcntl
+except ImportError:  # no flock (Windows): single-process use only
+    fcntl = None
+
+DEFAULT_PATH = os.environ.get("PRIME_STORE_PATH", "prime_store")
+
+# Pending log entries that trigger a merge into the base files
+MERGE_THRESHOLD = 100_000
+
+_U64_LIMIT = 1 << 64
+_HASH_MULT = 0x9E3779B97F4A7C15
+_RECORD_LEN = struct.Struct(">H")
+
+
+# ----- Record encoding (log and big-prime file) -----
+def _encode(n):
+    raw = n.to_bytes((n.bit_length() + 7) // 8, "big")
+    return _RECORD_LEN.pack(len(raw)) + raw
+
+
+def _decode_all(data):
+    """Decode length-prefixed records; a torn trailing record is ignored."""
+    view = memoryview(data)
+    out, pos = [], 0
+    while pos + _RECORD_LEN.size <= len(view):
+        (size,) = _RECORD_LEN.unpack_from(view, pos)
+        pos += _RECORD_LEN.size
+        if pos + size > len(view):
+            break
+        out.append(int.from_bytes(view[pos:pos + size], "big"))
+        pos += size
+    return out
+
+
+def _read_file(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return b""
+
+
+def _map_u64(path):
+    """Memory-map a uint64 file read-only (empty array if missing/empty)."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return np.zeros(0, dtype="<u8")
+    return np.memmap(path, dtype="<u8", mode="r")
+
+
+# ----- Hash index -----
+def _home_slot(n, bits):
+    return ((n * _HASH_MULT) & (_U64_LIMIT - 1)) >> (64 - bits)
+
+
+def build_index(values):
+    """Open-addressing table (capacity 2**k >= 2*len) over uint64 values."""
+    capacity = 8
+    while capacity < 2 * len(values):
+        capacity *= 2
+    bits = capacity.bit_length() - 1
+    mask = np.uint64(capacity - 1)
+    table = np.zeros(capacity, dtype="<u8")
+
+    pending = np.asarray(values, dtype=np.uint64)
+    slots = (pending * np.uint64(_HASH_MULT)) >> np.uint64(64 - bits)
+    # place in rounds: a free slot goes to the first claimant, the rest probe on
+    while pending.size:
+        free = np.flatnonzero(table[slots] == 0)
+        _, first = np.unique(slots[free], return_index=True)
+        winners = free[first]
+        table[slots[winners]] = pending[winners]
+        placed = np.zeros(pending.size, dtype=bool)
+        placed[winners] = True
+        pending = pending[~placed]
+        slots = (slots[~placed] + np.uint64(1)) & mask
+    return table
+
+
+def _index_contains(table, n):
+    capacity = table.shape[0]
+    if capacity == 0:
+        return False
+    bits = capacity.bit_length() - 1
+    slot = _home_slot(n, bits)
+    while True:
+        value = int(table[slot])
+        if value == n:
+            return True
+        if value == 0:
+            return False
+        slot = (slot + 1) & (capacity - 1)
+
+
+# ----- Store -----
+class PrimeStore:
+    """Sorted, indexed, append-friendly set of primes persisted in a directory."""
+
+    def __init__(self, path=DEFAULT_PATH, merge_threshold=MERGE_THRESHOLD):
+        self.path = path
+        self.merge_threshold = merge_threshold
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def _locked(self):
+        """Thread lock plus an exclusive flock on the store's lock file."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._file("lock"), "ab") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self):
+        self._base = _map_u64(self._file("base.u64"))
+        self._index = _map_u64(self._file("base.idx"))
+        if self._base.size and self._index.size == 0:
+            # index missing (e.g. interrupted merge): rebuild it
+            self._index = build_index(self._base)
+        self._big = sorted(set(_decode_all(_read_file(self._file("big.bin")))))
+        self._big_set = set(self._big)
+        self._pending = set()
+        for n in _decode_all(_read_file(self._file("append.log"))):
+            if not self._contains_merged(n):
+                self._pending.add(n)
+        self._pending_sorted = None
+
+    # ----- Queries -----
+    def _contains_merged(self, n):
+        if n < _U64_LIMIT:
+            return _index_contains(self._index, n)
+        return n in self._big_set
+
+    def __contains__(self, n):
+        if n < 2:
+            return False
+        with self._lock:
+            return n in self._pending or self._contains_merged(n)
+
+    def __len__(self):
+        with self._lock:
+            return int(self._base.size) + len(self._big) + len(self._pending)
+
+    def _sorted_pending(self):
+        if self._pending_sorted is None:
+            self._pending_sorted = sorted(self._pending)
+        return self._pending_sorted
+
+    def range(self, lo, hi):
+        """Stored primes p with lo <= p <= hi, as a PrimeSequence."""
+        with self._lock:
+            parts = []
+            if lo < _U64_LIMIT and self._base.size:
+                a = np.searchsorted(self._base, np.uint64(max(lo, 0)), side="left")
+                b = np.searchsorted(self._base, np.uint64(min(hi, _U64_LIMIT - 1)), side="right")
+                parts.append(self._base[a:b].tolist())
+            parts.append(self._big[bisect_left(self._big, lo):bisect_right(self._big, hi)])
+            pending = self._sorted_pending()
+            parts.append(pending[bisect_left(pending, lo):bisect_right(pending, hi)])
+            return PrimeSequence(list(merge_sorted(*parts)))
+
+    def __iter__(self):
+        with self._lock:
+            parts = (self._base.tolist(), list(self._big), list(self._sorted_pending()))
+        return merge_sorted(*parts)
+
+    def largest(self, k):
+        """The k largest stored primes, in increasing order, as a PrimeSequence."""
+        if k <= 0:
+            return PrimeSequence()
+        with self._lock:
+            pending = self._sorted_pending()
+            tail = sorted(self._big[-k:] + pending[-k:] + self._base[-k:].tolist())
+            return PrimeSequence(tail[-k:])
+
+    # ----- Updates -----
+    def add_many(self, primes):
+        """Add primes in one batched log append; returns how many were new."""
+        with self._locked():
+            new = []
+            for n in primes:
+                n = int(n)
+                if n >= 2 and n not in self._pending and not self._contains_merged(n):
+                    self._pending.add(n)
+                    new.append(n)
+            if not new:
+                return 0
+            with open(self._file("append.log"), "ab") as f:
+                f.write(b"".join(_encode(n) for n in new))
+            self._pending_sorted = None
+            full = len(self._pending) >= self.merge_threshold
+        if full:
+            self.merge()  # after releasing the flock, which merge takes again
+        return len(new)
+
+    def add(self, n):
+        """Add one prime; returns True if it was not stored yet."""
+        return self.add_many((n,)) == 1
+
+    def merge(self):
+        """Fold the append log into the sorted base files and clear it.
+
+        The files are re-read under the lock first, so primes that other
+        processes merged or appended since this store loaded are kept.
+        """
+        with self._locked():
+            self._load()
+            if not self._pending:
+                return
+            small = np.array([n for n in self._pending if n < _U64_LIMIT], dtype=np.uint64)
+            big = [n for n in self._pending if n >= _U64_LIMIT]
+
+            if small.size:
+                base = np.union1d(np.asarray(self._base), small).astype("<u8")
+                # drop the index first so a crash never pairs the new base
+                # with a stale index; a missing index is rebuilt on load
+                if os.path.exists(self._file("base.idx")):
+                    os.remove(self._file("base.idx"))
+                self._replace("base.u64", base.tobytes())
+                self._replace("base.idx", build_index(base).tobytes())
+            if big:
+                merged = sorted(self._big_set.union(big))
+                self._replace("big.bin", b"".join(_encode(n) for n in merged))
+
+            self._replace("append.log", b"")
+            self._load()
+
+    def _replace(self, name, data):
+        tmp = self._file(name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._file(name))
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def default_store():
+    """Process-wide store at DEFAULT_PATH, opened on first use."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = PrimeStore(DEFAULT_PATH)
+        return _default_store
@@ -0,0 +1,130 @@
+"""Range scanning: sieve a window, then test only the survivors.
+
+scan_range handles one interval in the calling process.  The parallel
+engine splits [start, end] into fixed-size chunks, scans them on a
+process pool (each worker sieves its own window and tests its own
+survivors) and yields the results in range order, keeping a bounded
+number of chunks in flight so memory stays flat for huge intervals.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from math import isqrt
+
+import numpy as np
+
+from primality import BATCH_LIMIT, is_prime, is_probable_prime_batch
+from segmented_sieve import base_primes, iter_window_survivors
+
+# Base primes used to pre-sieve range scans when none are supplied
+SCAN_BASE_LIMIT = 1 << 20
+
+# Numbers per chunk handed to a worker
+DEFAULT_CHUNK_SIZE = 1 << 22
+
+_U64_LIMIT = 1 << 64
+
+
+# ----- Single process -----
+def scan_range(start, end, small_primes=None):
+    """Return the primes in [start, end] in increasing order.
+
+    The window is sieved with the base primes in one vectorized pass;
+    survivors are proven prime when the base primes reach isqrt(end),
+    otherwise they go through Miller-Rabin (batched below 2**32).  The
+    default base primes reach isqrt(end) for every end below 2**40, so
+    the Miller-Rabin paths only run for larger ranges or when the
+    caller's `small_primes` stop short; sieving deeper is cheaper than
+    batch-testing the extra survivors.
+    """
+    if end < 2:
+        return []
+    if small_primes is None:
+        sieve_bound = min(isqrt(end), SCAN_BASE_LIMIT)
+        small_primes = base_primes(sieve_bound)
+    else:
+        sieve_bound = int(small_primes[-1]) if len(small_primes) else 1
+    proven = sieve_bound >= isqrt(end)
+    batch = end < BATCH_LIMIT
+
+    found = [2] if start <= 2 <= end else []
+    for lo, mask in iter_window_survivors(start, end, small_primes):
+        idx = np.flatnonzero(mask)
+        if proven:
+            found.extend(lo + 2 * i for i in idx.tolist())
+        elif batch:
+            nums = np.uint64(lo) + np.uint64(2) * idx.astype(np.uint64)
+            found.extend(nums[is_probable_prime_batch(nums)].tolist())
+        else:
+            found.extend(num for num in (lo + 2 * i for i in idx.tolist()) if is_prime(num))
+    return found
+
+
+# ----- Parallel engine -----
+def iter_chunks(start, end, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield consecutive (lo, hi) sub-intervals covering [start, end]."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1.")
+    lo = start
+    while lo <= end:
+        hi = min(lo + chunk_size - 1, end)
+        yield lo, hi
+        lo = hi + 1
+
+
+def _scan_chunk(lo, hi, small_primes):
+    """Worker: scan one chunk; results below 2**64 travel back as uint64."""
+    found = scan_range(lo, hi, small_primes)
+    if hi < _U64_LIMIT:
+        return np.array(found, dtype=np.uint64)
+    return found
+
+
+def _as_list(found):
+    return found.tolist() if isinstance(found, np.ndarray) else found
+
+
+def iter_parallel_scan(start, end, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                       small_primes=None, pool=None):
+    """Yield (lo, hi, primes) for each chunk of [start, end], in order.
+
+    Chunks run on `workers` processes (default: all cores), or on an
+    existing `pool`; with one worker everything runs in-process.  At most
+    2 * workers chunks are in flight.  Closing the generator early cancels
+    chunks that have not started.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = iter_chunks(max(start, 0), end, chunk_size)
+    if workers <= 1 and pool is None:
+        for lo, hi in chunks:
+            yield lo, hi, scan_range(lo, hi, small_primes)
+        return
+
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    in_flight = deque()
+    try:
+        for lo, hi in chunks:
+            in_flight.append((lo, hi, pool.submit(_scan_chunk, lo, hi, small_primes)))
+            if len(in_flight) >= 2 * workers:
+                lo_done, hi_done, future = in_flight.popleft()
+                yield lo_done, hi_done, _as_list(future.result())
+        while in_flight:
+            lo_done, hi_done, future = in_flight.popleft()
+            yield lo_done, hi_done, _as_list(future.result())
+    finally:
+        for _, _, future in in_flight:
+            future.cancel()
+        if own_pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def parallel_scan(start, end, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, small_primes=None):
+    """Primes in [start, end] in increasing order, scanned on a process pool."""
+    found = []
+    for _, _, primes in iter_parallel_scan(start, end, workers, chunk_size, small_primes):
+        found.extend(primes)
+    return found
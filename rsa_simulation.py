@@ -1,78 +1,156 @@
-import secrets
-import random
-
-# ----- Sieve of Eratosthenes -----
-def sieve(limit):
-    if limit < 2:
-        return []
-    arr = bytearray(b'\x01') * (limit + 1)
-    arr[0:2] = b'\x00\x00'
-    for p in range(2, int(limit ** 0.5) + 1):
-        if arr[p]:
-            arr[p*p : limit+1 : p] = b'\x00' * ((limit - p*p)//p + 1)
-    return [i for i, isprime in enumerate(arr) if isprime]
-
-# ----- Miller-Rabin -----
-def is_probable_prime(n, k=12):
-    if n < 2:
-        return False
-    small_primes = [2,3,5,7,11,13,17,19,23,29]
-    for p in small_primes:
-        if n % p == 0:
-            return n == p
-    d = n - 1
-    s = 0
-    while d % 2 == 0:
-        d //= 2
-        s += 1
-    for _ in range(k):
-        a = secrets.randbelow(n - 3) + 2
-        x = pow(a, d, n)
-        if x == 1 or x == n - 1:
-            continue
-        for _ in range(s - 1):
-            x = pow(x, 2, n)
-            if x == n - 1:
-                break
-        else:
-            return False
-    return True
+import ciphertext
+import metrics
+from bigint_backend import gcd, invert, powmod
+from prime_core import is_probable_prime, sieve
+
+# sieve and is_probable_prime lived here before prime_core; they stay
+# importable from this module for existing callers
+__all__ = ["RSA", "is_probable_prime", "sieve"]
 
 # ----- RSA Class -----
 class RSA:
-    def __init__(self, p, q, e=65537):
-        if not (is_probable_prime(p) and is_probable_prime(q)):
-            raise ValueError("Both p and q must be prime.")
-        if p == q:
+    """Textbook RSA with CRT private operations.
+
+    Pass `extra_primes` for multi-prime RSA (n = p * q * r_3 * ...); the
+    private exponent is then applied modulo each prime separately and
+    recombined with Garner's algorithm.  `validate=False` skips the
+    primality tests for primes that are already known to be prime (from
+    the generator, the prime store or the sieve).
+    """
+
+    def __init__(self, p, q, e=65537, extra_primes=(), validate=True):
+        primes = (p, q) + tuple(extra_primes)
+        if validate and not all(is_probable_prime(r) for r in primes):
+            raise ValueError("Both p and q must be prime." if len(primes) == 2 else "All factors must be prime.")
+        if len(set(primes)) != len(primes):
             raise ValueError("p and q must be distinct primes.")
         self.p = p
         self.q = q
-        self.n = p * q
-        self.phi = (p-1)*(q-1)
+        self.primes = primes
+        self.n = 1
+        self.phi = 1
+        for r in primes:
+            self.n *= r
+            self.phi *= r - 1
+        if gcd(e, self.phi) != 1:
+            raise ValueError("e must be coprime to phi(n); pick other primes.")
         self.e = e
         self.d = self.mod_inverse(e, self.phi)
 
+        # CRT parameters: dp, dq, q^-1 mod p, then (d_i, t_i) per extra prime
+        self.dp = self.crt_exponent(p)
+        self.dq = self.crt_exponent(q)
+        self.qinv = self.mod_inverse(q, p)
+        self.crt_extra = []
+        prefix = p * q
+        for r in extra_primes:
+            self.crt_extra.append((r, self.crt_exponent(r), self.mod_inverse(prefix % r, r)))
+            prefix *= r
+
+    def crt_exponent(self, r):
+        """d reduced mod r - 1, as r - 1 rather than 0 (r = 2), so c**0 = 1 never replaces c**d mod r."""
+        return self.d % (r - 1) or r - 1
+
     def mod_inverse(self, a, m):
-        m0 = m
-        x0, x1 = 0, 1
-        if m == 1:
-            return 0
-        while a > 1:
-            q = a // m
-            a, m = m, a % m
-            x0, x1 = x1 - q*x0, x0
-        if x1 < 0:
-            x1 += m0
-        return x1
-
-    def encrypt(self, plaintext):
-        if not plaintext.isalnum():
-            raise ValueError("Plaintext must be alphanumeric (no spaces or special chars).")
-        return " ".join([str(pow(ord(c), self.e, self.n)) for c in plaintext])
-
-    def decrypt(self, ciphertext):
-        parts = ciphertext.strip().split()
-        if not all(p.isdigit() for p in parts):
-            raise ValueError("Ciphertext must be numbers separated by spaces.")
-        nums = list(map(int, parts))
-        return "".join([chr(pow(c, self.d, self.n)) for c in nums])
+        return invert(a, m)
+
+    def encrypt_int(self, m):
+        """Public operation m^e mod n."""
+        if metrics.ENABLED:
+            metrics.inc("modexp_total")
+        return powmod(m, self.e, self.n)
+
+    def decrypt_int(self, c):
+        """Private operation c^d mod n via CRT and Garner recombination."""
+        if metrics.ENABLED:
+            metrics.inc("modexp_total", len(self.primes))
+        m1 = powmod(c, self.dp, self.p)
+        m2 = powmod(c, self.dq, self.q)
+        h = (m1 - m2) * self.qinv % self.p
+        m = m2 + self.q * h
+        prefix = self.p * self.q
+        for r, dr, t in self.crt_extra:
+            h = (powmod(c, dr, r) - m) * t % r
+            m += prefix * h
+            prefix *= r
+        return m
+
+    @property
+    def block_size(self):
+        """Plaintext bytes per block: the largest k with 256**k <= n."""
+        return (self.n.bit_length() - 1) // 8
+
+    def encrypt_bytes(self, data):
+        """Encrypt arbitrary bytes into a list of integer blocks.
+
+        The message is padded ISO/IEC 7816-4 style (one 0x80 byte, then
+        zero bytes up to a multiple of block_size) and cut into big-endian
+        blocks, each of which is below n.
+        """
+        k = self.block_size
+        if k < 1:
+            raise ValueError("Modulus too small for block encryption (need n >= 256).")
+        timed = metrics.ENABLED
+        if timed:
+            t0 = metrics.now()
+            metrics.inc("rsa_bytes_encrypted_total", len(data))
+        data = bytes(data) + b"\x80"
+        data += b"\x00" * (-len(data) % k)
+        blocks = [self.encrypt_int(int.from_bytes(data[i:i + k], "big")) for i in range(0, len(data), k)]
+        if timed:
+            metrics.observe("rsa_encrypt_seconds", metrics.now() - t0)
+        return blocks
+
+    def decrypt_bytes(self, blocks):
+        """Inverse of encrypt_bytes: decrypt the blocks and strip the padding."""
+        k = self.block_size
+        timed = metrics.ENABLED
+        if timed:
+            t0 = metrics.now()
+        out = bytearray()
+        for c in blocks:
+            if not 0 <= c < self.n:
+                raise ValueError("Ciphertext block out of range for this key.")
+            m = self.decrypt_int(c)
+            if m >> (8 * k):
+                raise ValueError("Ciphertext was not produced with this key.")
+            out += m.to_bytes(k, "big")
+        data = bytes(out).rstrip(b"\x00")
+        if not data.endswith(b"\x80"):
+            raise ValueError("Invalid padding; ciphertext was not produced with this key.")
+        if timed:
+            metrics.inc("rsa_bytes_decrypted_total", len(data) - 1)
+            metrics.observe("rsa_decrypt_seconds", metrics.now() - t0)
+        return data[:-1]
+
+    def encrypt(self, plaintext, armor=True):
+        """Encrypt text into a ciphertext container (base64 str, or bytes if not armor)."""
+        return ciphertext.pack(self.encrypt_bytes(plaintext.encode("utf-8")), self.n, armor=armor)
+
+    def decrypt(self, data):
+        """Decrypt a container from encrypt() (armored str or raw bytes).
+
+        Decimal block values separated by whitespace are still accepted:
+        padded blocks as written before the container format, and the
+        original one-number-per-character ciphertext (no padding).
+        """
+        parts = data.split() if isinstance(data, str) and data.isascii() else None
+        if parts and all(part.isdigit() for part in parts):
+            nums = list(map(int, parts))
+            try:
+                return self.decrypt_bytes(nums).decode("utf-8")
+            except ValueError:
+                return self._decrypt_chars(nums)
+        width, nums = ciphertext.unpack(data.strip() if isinstance(data, str) else data)
+        if width != ciphertext.block_width(self.n):
+            raise ValueError("Ciphertext was produced for a different modulus size.")
+        return self.decrypt_bytes(nums).decode("utf-8")
+
+    def _decrypt_chars(self, nums):
+        """The original format: one block per character, holding its code point."""
+        if not all(0 <= c < self.n for c in nums):
+            raise ValueError("Ciphertext block out of range for this key.")
+        try:
+            return "".join(chr(self.decrypt_int(c)) for c in nums)
+        except (ValueError, OverflowError):
+            raise ValueError("Ciphertext was not produced with this key.") from None
@@ -0,0 +1,147 @@
+"""Streaming RSA file encryption/decryption.
+
+A file is processed in fixed-size chunks.  Every plaintext chunk becomes
+one self-contained ciphertext container (see ciphertext.py), so the output
+is a sequence of frames that can be decrypted one at a time.  Chunks are
+handed to a process pool with a bounded number in flight and written back
+in input order, so memory stays constant and throughput scales with cores.
+
+Usage:
+    python rsa_stream.py encrypt SRC DST --p P --q Q [--workers N]
+    python rsa_stream.py decrypt SRC DST --p P --q Q [--workers N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import ciphertext
+from rsa_simulation import RSA
+
+# Plaintext bytes per frame
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Key installed in each worker process by _init_worker
+_worker_rsa = None
+
+
+def _init_worker(rsa):
+    global _worker_rsa
+    _worker_rsa = rsa
+
+
+def _encrypt_chunk(chunk):
+    return ciphertext.pack(_worker_rsa.encrypt_bytes(chunk), _worker_rsa.n)
+
+
+def _decrypt_frame(frame):
+    width, blocks = ciphertext.unpack(frame)
+    if width != ciphertext.block_width(_worker_rsa.n):
+        raise ValueError("Ciphertext was produced for a different modulus size.")
+    return _worker_rsa.decrypt_bytes(blocks)
+
+
+# ----- Readers -----
+def iter_chunks(f, chunk_size):
+    """Yield fixed-size chunks of a binary file."""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_frames(f):
+    """Yield the raw ciphertext containers of an encrypted stream in order."""
+    while True:
+        header = f.read(ciphertext.HEADER.size)
+        if not header:
+            return
+        width, count, _ = ciphertext.read_header(header)
+        payload = f.read(width * count)
+        if len(payload) != width * count:
+            raise ValueError("Encrypted stream is truncated.")
+        yield header + payload
+
+
+# ----- Pipeline -----
+def _run(rsa, items, func, out, workers):
+    """Apply func to items on a pool, writing results to out in input order."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    total = 0
+    if workers <= 1:
+        _init_worker(rsa)
+        for item in items:
+            result = func(item)
+            out.write(result)
+            total += len(result)
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rsa,)) as pool:
+        in_flight = deque()
+        for item in items:
+            in_flight.append(pool.submit(func, item))
+            if len(in_flight) >= 2 * workers:
+                result = in_flight.popleft().result()
+                out.write(result)
+                total += len(result)
+        while in_flight:
+            result = in_flight.popleft().result()
+            out.write(result)
+            total += len(result)
+    return total
+
+
+def encrypt_file(rsa, src, dst, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Encrypt file `src` into `dst`; returns the number of bytes written."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1.")
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        return _run(rsa, iter_chunks(fin, chunk_size), _encrypt_chunk, fout, workers)
+
+
+def decrypt_file(rsa, src, dst, workers=None):
+    """Decrypt a file written by encrypt_file; returns the plaintext size."""
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        return _run(rsa, iter_frames(fin), _decrypt_frame, fout, workers)
+
+
+# ----- CLI -----
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a file through RSA encryption or decryption.")
+    parser.add_argument("action", choices=["encrypt", "decrypt"])
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    parser.add_argument("--p", type=int, required=True, help="first prime of the key")
+    parser.add_argument("--q", type=int, required=True, help="second prime of the key")
+    parser.add_argument("--e", type=int, default=65537, help="public exponent")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="plaintext bytes per frame")
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be >= 1")
+
+    try:
+        rsa = RSA(args.p, args.q, args.e)
+        t0 = time.perf_counter()
+        if args.action == "encrypt":
+            written = encrypt_file(rsa, args.src, args.dst, args.workers, args.chunk_size)
+        else:
+            written = decrypt_file(rsa, args.src, args.dst, args.workers)
+        elapsed = time.perf_counter() - t0
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    size = os.path.getsize(args.src)
+    print(f"{args.action}ed {size} bytes -> {written} bytes in {elapsed:.3f}s "
+          f"({size / max(elapsed, 1e-9) / 1e6:.2f} MB/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
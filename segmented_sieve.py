@@ -0,0 +1,233 @@
+"""Segmented, odd-only Sieve of Eratosthenes.
+
+Only odd numbers are represented, and the range is processed in
+cache-sized segments, so memory stays bounded by the segment size plus
+the base primes up to sqrt(limit).  Striking is done with NumPy slice
+assignment; primes above a segment's length hit it at most a few times
+and are struck in a single fancy-indexing pass.
+"""
+
+from math import isqrt
+
+import numpy as np
+
+import metrics
+
+# 2**18 odd candidates per segment -> 256 KiB working buffer (fits in L2)
+DEFAULT_SEGMENT_SIZE = 1 << 18
+
+
+# ----- Base primes -----
+def base_primes(limit):
+    """All primes <= limit as a uint64 array (simple odd-only sieve)."""
+    if limit < 2:
+        return np.zeros(0, dtype=np.uint64)
+    # index i represents the odd number 2*i + 1
+    size = (limit - 1) // 2 + 1
+    odd = np.ones(size, dtype=bool)
+    odd[0] = False
+    for i in range(1, (isqrt(limit) - 1) // 2 + 1):
+        if odd[i]:
+            p = 2 * i + 1
+            odd[p * p // 2::p] = False
+    primes = np.flatnonzero(odd).astype(np.uint64) * 2 + 1
+    return np.concatenate((np.array([2], dtype=np.uint64), primes))
+
+
+# ----- Segment striking -----
+def _strike_offsets(segment, primes, offsets):
+    """Clear every p-th entry of `segment` starting at the matching offset.
+
+    Entries with an offset past the end of the segment are ignored.
+    """
+    timed = metrics.ENABLED
+    if timed:
+        t0 = metrics.now()
+    n = segment.shape[0]
+    keep = offsets < n
+    primes, offsets = primes[keep], offsets[keep]
+
+    small = primes < n
+    for p, off in zip(primes[small].tolist(), offsets[small].tolist()):
+        segment[off::p] = False
+
+    # large primes: each hits the segment only a handful of times
+    big_p, big_off = primes[~small], offsets[~small]
+    if big_p.size:
+        counts = (n - 1 - big_off) // big_p + 1
+        rep_p = np.repeat(big_p, counts)
+        first = np.repeat(big_off, counts)
+        group_start = np.repeat(np.cumsum(counts) - counts, counts)
+        step = np.arange(rep_p.size, dtype=np.int64) - group_start
+        segment[first + step * rep_p] = False
+    if timed:
+        metrics.inc("sieve_segments_total")
+        metrics.observe("sieve_segment_seconds", metrics.now() - t0)
+
+
+def _strike(segment, lo, primes):
+    """Clear multiples of `primes` in an odd-only segment starting at odd `lo`.
+
+    `primes` must be odd base primes (as int64); index i of `segment` is
+    the number lo + 2*i.
+    """
+    if primes.size == 0:
+        return
+    # first odd multiple of p that is >= max(p*p, lo)
+    start = np.maximum(primes * primes, ((lo + primes - 1) // primes) * primes)
+    start += np.where(start % 2 == 0, primes, 0)
+    _strike_offsets(segment, primes, (start - lo) // 2)
+
+
+def iter_segments(limit, start=0, segment_size=DEFAULT_SEGMENT_SIZE):
+    """Yield (lo, mask) pairs covering the odd numbers in [start, limit].
+
+    `mask[i]` is True when lo + 2*i is prime.  The final mask is trimmed
+    so it never reaches past `limit`.
+    """
+    if limit < 3:
+        return
+    lo = max(start, 3) | 1
+    primes = base_primes(isqrt(limit))[1:].astype(np.int64)
+    while lo <= limit:
+        n = min(segment_size, (limit - lo) // 2 + 1)
+        segment = np.ones(n, dtype=bool)
+        _strike(segment, lo, primes[primes * primes < lo + 2 * n])
+        # base primes themselves are not struck (their first multiple is p*p)
+        yield lo, segment
+        lo += 2 * n
+
+
+def iter_window_survivors(start, end, primes, segment_size=DEFAULT_SEGMENT_SIZE):
+    """Sieve the window [start, end] with the given base primes.
+
+    Yields (lo, mask) pairs over the odd numbers of the window, where
+    `mask[i]` is False when lo + 2*i has a factor among `primes` (other
+    than itself).  `start` and `end` may be arbitrarily large Python ints;
+    only offsets inside the window touch NumPy.  The even prime 2 is not
+    reported.  Survivors are proven prime only when `primes` covers every
+    prime up to isqrt(end).
+    """
+    lo = max(start, 3) | 1
+    if lo > end:
+        return
+    primes = [p for p in map(int, primes) if p > 2 and p * p <= end]
+    # index of the first odd multiple >= max(p*p, lo), computed once in
+    # Python so that huge window offsets never reach int64
+    offsets = []
+    for p in primes:
+        m = max(p * p, lo + (-lo) % p)
+        if m % 2 == 0:
+            m += p
+        offsets.append((m - lo) // 2)
+    primes = np.array(primes, dtype=np.int64)
+    offsets = np.array(offsets, dtype=np.int64)
+    while lo <= end:
+        n = min(segment_size, (end - lo) // 2 + 1)
+        segment = np.ones(n, dtype=bool)
+        _strike_offsets(segment, primes, offsets)
+        yield lo, segment
+        # shift offsets to be relative to the next segment
+        offsets = np.where(offsets < n, (offsets - n) % primes, offsets - n)
+        lo += 2 * n
+
+
+# ----- Arithmetic progressions -----
+def _residues(x, primes):
+    """x mod p for every p in a uint64 array (p < 2**32), for a Python int x >= 0.
+
+    Horner's rule over the 32-bit limbs of x keeps every lane below 2**64.
+    """
+    r = np.zeros(primes.shape, dtype=np.uint64)
+    for shift in range(32 * ((x.bit_length() - 1) // 32), -1, -32):
+        limb = np.uint64((x >> shift) & 0xFFFFFFFF)
+        r = ((r << np.uint64(32)) | limb) % primes
+    return r
+
+
+def _inverses(s, primes):
+    """s^-1 mod p lane by lane (Fermat, p prime < 2**31); 0 where p divides s."""
+    result = np.where(s == 0, np.uint64(0), np.uint64(1))
+    e = primes - np.uint64(2)
+    one = np.uint64(1)
+    while e.any():
+        odd = (e & one).astype(bool)
+        result = np.where(odd, result * s % primes, result)
+        s = s * s % primes
+        e >>= one
+    return result
+
+
+def progression_survivors(a, step, count, primes, mask=None):
+    """Sieve the progression a, a + step, ..., a + (count-1)*step.
+
+    Returns a bool mask where `mask[k]` is False when a + k*step has a
+    factor among `primes` (a uint64 array of primes below 2**31); a and
+    step must be coprime.  Only primes below `a` are used, so every
+    struck value is composite.  Pass an existing `mask` to strike a
+    second progression into the same window (it is updated in place).
+    """
+    if mask is None:
+        mask = np.ones(count, dtype=bool)
+    if a < 2**63:
+        primes = primes[primes < np.uint64(a)]
+    if primes.size == 0:
+        return mask
+    inv = _inverses(_residues(step, primes), primes)
+    # k = -a * step^-1 (mod p); primes dividing step never divide a term, skip them
+    offsets = (primes - _residues(a, primes)) % primes * inv % primes
+    offsets = np.where(inv == 0, np.uint64(count), offsets)
+    _strike_offsets(mask, primes.astype(np.int64), offsets.astype(np.int64))
+    return mask
+
+
+def iter_prime_segments(limit, start=0, segment_size=DEFAULT_SEGMENT_SIZE):
+    """Yield uint64 arrays of the primes in [start, limit], segment by segment."""
+    if start <= 2 <= limit:
+        yield np.array([2], dtype=np.uint64)
+    for lo, segment in iter_segments(limit, start, segment_size):
+        yield np.flatnonzero(segment).astype(np.uint64) * 2 + lo
+
+
+def iter_primes(limit, start=0, segment_size=DEFAULT_SEGMENT_SIZE):
+    """Yield every prime in [start, limit] as a Python int."""
+    for chunk in iter_prime_segments(limit, start, segment_size):
+        yield from chunk.tolist()
+
+
+def primes_up_to(limit, segment_size=DEFAULT_SEGMENT_SIZE):
+    """All primes <= limit as one uint64 array."""
+    chunks = list(iter_prime_segments(limit, 0, segment_size))
+    if not chunks:
+        return np.zeros(0, dtype=np.uint64)
+    return np.concatenate(chunks)
+
+
+def count_primes(limit, start=0, segment_size=DEFAULT_SEGMENT_SIZE):
+    """Number of primes in [start, limit] without materializing them."""
+    total = 1 if start <= 2 <= limit else 0
+    for _, segment in iter_segments(limit, start, segment_size):
+        total += int(np.count_nonzero(segment))
+    return total
+
+
+def iter_packed_segments(limit, segment_size=DEFAULT_SEGMENT_SIZE):
+    """Yield the odd-only prime bitmap for [0, limit] as packed bytes.
+
+    Bit j (little-endian within each byte) of the concatenated output
+    says whether 2*j + 1 is prime.
+    """
+    if limit < 1:
+        return
+    if limit < 3:
+        yield np.zeros(1, dtype=np.uint8).tobytes()
+        return
+    # the first segment starts at 3, i.e. bit 1; bit 0 (the number 1) is 0
+    carry = np.zeros(1, dtype=bool)
+    for _, segment in iter_segments(limit, 3, segment_size):
+        bits = np.concatenate((carry, segment))
+        whole = bits.size - bits.size % 8
+        yield np.packbits(bits[:whole], bitorder="little").tobytes()
+        carry = bits[whole:]
+    if carry.size:
+        yield np.packbits(carry, bitorder="little").tobytes()
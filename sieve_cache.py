@@ -0,0 +1,105 @@
+"""Process-wide cache of sieve results.
+
+One cache is shared by every session of the Streamlit app.  A request for
+primes up to `limit` is served as a prefix (a NumPy view, no copy) of any
+cached result with a limit at least as large.  Entries are evicted least
+recently used first once their total size exceeds the memory budget.
+Concurrent requests that a running computation will cover wait for it
+instead of sieving again (single-flight).
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from prime_sequence import PrimeSequence
+from segmented_sieve import primes_up_to
+
+DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+
+
+class SieveCache:
+    """Thread-safe LRU cache of primes_up_to(limit) results."""
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()  # limit -> read-only uint64 array
+        self._inflight = {}  # limit -> threading.Event
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _lookup(self, limit):
+        """Prefix view of the smallest cached result covering limit, or None."""
+        covering = [L for L in self._entries if L >= limit]
+        if not covering:
+            return None
+        best = min(covering)
+        self._entries.move_to_end(best)
+        primes = self._entries[best]
+        return primes[:np.searchsorted(primes, np.uint64(max(limit, 0)), side="right")]
+
+    def get(self, limit):
+        """All primes <= limit as a PrimeSequence (possibly a view of a shared entry)."""
+        waited = False
+        while True:
+            with self._lock:
+                primes = self._lookup(limit)
+                if primes is not None:
+                    if waited:
+                        self.coalesced += 1
+                    else:
+                        self.hits += 1
+                    return PrimeSequence(primes)
+                running = [L for L in self._inflight if L >= limit]
+                if running:
+                    event = self._inflight[min(running)]
+                else:
+                    event = threading.Event()
+                    self._inflight[limit] = event
+                    self.misses += 1
+                    break
+            # another thread is sieving a covering limit: wait and retry
+            event.wait()
+            waited = True
+
+        try:
+            primes = primes_up_to(limit)
+            primes.flags.writeable = False
+            with self._lock:
+                self._store(limit, primes)
+        finally:
+            with self._lock:
+                del self._inflight[limit]
+            event.set()
+        return PrimeSequence(primes)
+
+    def _store(self, limit, primes):
+        self._entries[limit] = primes
+        while len(self._entries) > 1 and self.nbytes > self.budget_bytes:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self._entries.values())
+
+    def stats(self):
+        """Counters and current footprint, for display."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "largest_limit": max(self._entries, default=0),
+                "bytes": self.nbytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()